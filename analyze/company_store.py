@@ -0,0 +1,230 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# -----------------------------
+# Settings
+# -----------------------------
+COMPANY_DB = os.getenv("COMPANY_DB", "analyze/company_data.sqlite3")
+COMPANY_JSON = "analyze/company_data.json"   # legacy file, imported on first use
+SCOPES = ("scope1", "scope2", "scope3")
+PARSER_VERSION = 2   # bump when parse_emissions changes; stored values are re-parsed
+
+# -----------------------------
+# Emission value parsing
+# -----------------------------
+# Numbers that are not part of a word ("CO2e", "FY2023") or a decimal
+EMISSIONS_NUMBER = re.compile(r"(?<![\w.])\d[\d,]*(?:\.\d+)?")
+YEAR = re.compile(r"(?:19|20)\d\d")
+# A number right after one of these labels is a year or a scope, not the value
+# (also the later numbers of a list: "Scope 1 and 2: ...")
+LABEL_BEFORE = re.compile(r"\b(?:FY|CY|scopes?|year)\s*[:\-]?\s*(?:\d\s*(?:,|and|&|\+|/)\s*)*$", re.IGNORECASE)
+# Any tonne unit after a number ("t", "tCO2e", "tonnes", "metric tons", "kt", "Mt")
+TONNES_AFTER = re.compile(r"(?:[kmg]?t(?:co|onnes?|ons?)?|metric\s+tons?|tonnes?)(?![a-z])", re.IGNORECASE)
+# Unit tokens that scale the number to tonnes. "Mt"/"Gt" are case-sensitive:
+# "MT" and "mt" are metric tonnes
+SCALE_UNITS = (
+    (re.compile(r"Gt(?![a-z])"), 1e9),
+    (re.compile(r"(?i:billion|bn)(?![a-zA-Z])"), 1e9),
+    (re.compile(r"Mt(?![a-z])"), 1e6),
+    (re.compile(r"(?i:million|mn|mio)(?![a-zA-Z])"), 1e6),
+    (re.compile(r"[kK][tT](?![a-z])|(?i:thousand|k)(?![a-zA-Z])"), 1e3),
+)
+
+def parse_emissions(value):
+    """
+    Emissions in tCO2e from a reported value:
+      "110,000 tCO2e" -> 110000.0       "1.2 MtCO2e" -> 1200000.0
+      "1,234 MT CO2e" -> 1234.0         "5 metric tons" -> 5.0
+      "350 ktCO2e" -> 350000.0          "12k tCO2e" -> 12000.0
+      "FY2023: 12,000 tCO2e" -> 12000.0 "2022 - 4.5 million tonnes" -> 4500000.0
+      "Scope 3: 900 t" -> 900.0         "Scope 1 and 2: 50,000 t" -> 50000.0
+      "Not available" -> None
+    The first number that is not inside a word ("CO2e"), not a year and not
+    after a FY/Scope label counts; a year is read only when a tonne unit follows it.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value)
+    for m in EMISSIONS_NUMBER.finditer(text):
+        rest = text[m.end():].lstrip()
+        if LABEL_BEFORE.search(text[:m.start()]):
+            continue
+        if YEAR.fullmatch(m.group()) and not TONNES_AFTER.match(rest):
+            continue
+
+        number = float(m.group().replace(",", ""))
+        for unit, scale in SCALE_UNITS:
+            if unit.match(rest):
+                return number * scale
+        return number
+
+    return None
+
+# -----------------------------
+# SQLite company store
+# -----------------------------
+class CompanyStore:
+    """
+    One row per company, upserted by name. Scope 1/2/3 emissions are stored
+    both as reported and as numbers (tCO2e) parsed once at ingest.
+    WAL mode lets Streamlit sessions read while another one writes.
+    """
+
+    def __init__(self, db_path=COMPANY_DB, legacy_json=COMPANY_JSON):
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS companies (
+                name TEXT PRIMARY KEY,
+                esg_rating TEXT,
+                cdp_score TEXT,
+                scope1 REAL,
+                scope2 REAL,
+                scope3 REAL,
+                year TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._reparse_if_stale()
+
+        if legacy_json and len(self) == 0 and os.path.exists(legacy_json):
+            self.import_json(legacy_json)
+
+    def _reparse_if_stale(self):
+        # Numbers parsed by an older parse_emissions are recomputed from the stored data
+        with self._lock:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] >= PARSER_VERSION:
+                return
+            rows = self._conn.execute("SELECT name, data FROM companies").fetchall()
+            self._conn.executemany(
+                "UPDATE companies SET scope1 = ?, scope2 = ?, scope3 = ? WHERE name = ?",
+                [(*self._row(name, json.loads(data))[3:6], name) for name, data in rows]
+            )
+            self._conn.execute(f"PRAGMA user_version = {PARSER_VERSION}")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+
+    @staticmethod
+    def _row(name, data):
+        carbon = data.get("carbon_footprint") or {}
+        values = [parse_emissions(carbon.get(scope)) for scope in SCOPES]
+        return (
+            name, data.get("ESG_rating"), data.get("CDP_score"), *values,
+            carbon.get("year"), json.dumps(data, ensure_ascii=False), time.time()
+        )
+
+    def upsert_many(self, companies):
+        """
+        companies: {name: ESG data dict in the scrapper's JSON format}.
+        """
+        rows = [self._row(name, data) for name, data in companies.items()]
+
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO companies (name, esg_rating, cdp_score, scope1, scope2, scope3, year, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    esg_rating = excluded.esg_rating,
+                    cdp_score = excluded.cdp_score,
+                    scope1 = excluded.scope1,
+                    scope2 = excluded.scope2,
+                    scope3 = excluded.scope3,
+                    year = excluded.year,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                """,
+                rows
+            )
+            self._conn.commit()
+
+    def upsert(self, name, data):
+        self.upsert_many({name: data})
+
+    def get(self, name, default=None):
+        """
+        The company's ESG data dict, with the parsed emissions under "scope_values".
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, scope1, scope2, scope3 FROM companies WHERE name = ?", (name,)
+            ).fetchone()
+
+        if row is None:
+            return default
+
+        data = json.loads(row[0])
+        data["scope_values"] = dict(zip(SCOPES, row[1:]))
+        return data
+
+    def names(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT name FROM companies ORDER BY name")]
+
+    # ---- JSON compatibility ----
+    def import_json(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                companies = json.load(f)
+            except json.JSONDecodeError:
+                companies = {}
+
+        self.upsert_many(companies)
+        return len(companies)
+
+    def export_json(self, path):
+        """
+        Writes every company in the company_data.json format.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT name, data FROM companies ORDER BY name").fetchall()
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({name: json.loads(data) for name, data in rows}, f, indent=4, ensure_ascii=False)
+        os.replace(tmp, path)
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+
+def get_company_store():
+    global _store
+    if _store is None:
+        _store = CompanyStore()
+    return _store
+
+
+if __name__ == "__main__":
+    # python analyze/company_store.py import|export [file.json]
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    path = sys.argv[2] if len(sys.argv) > 2 else COMPANY_JSON
+
+    store = get_company_store()
+    if command == "import":
+        print(f"✅ Imported {store.import_json(path)} companies from {path}")
+    else:
+        print(f"✅ Exported {store.export_json(path)} companies to {path}")
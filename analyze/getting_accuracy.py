@@ -1,29 +1,64 @@
+import asyncio
 import json
+import random
 from pathlib import Path
-from groq import Groq
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+try:
+    from analyze.llm_cache import LLM_CACHE_ENABLED, LLMCache, get_llm_cache, is_json
+except ImportError:   # run as a script from analyze/
+    from llm_cache import LLM_CACHE_ENABLED, LLMCache, get_llm_cache, is_json
+
+try:
+    from tracing import span
+except ImportError:   # run as a standalone script: no tracing
+    from contextlib import nullcontext
+
+    def span(name, items=None, **attrs):
+        return nullcontext()
+
+GROQ_MODEL = "moonshotai/kimi-k2-instruct-0905"
+CHAT_PARAMS = {"temperature": 0.0, "max_tokens": 150}
 
 # -----------------------------
-# Setup Groq client
+# Settings for concurrent evaluation
 # -----------------------------
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# "async" sends every theme at once over one pooled client; "sync" goes one by one
+GROQ_EVAL_MODE = os.getenv("GROQ_EVAL_MODE", "async")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+GROQ_CONCURRENCY = int(os.getenv("GROQ_CONCURRENCY", "4"))
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))      # seconds per request
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+BACKOFF_BASE = 0.5    # seconds, doubled on every retry
+BACKOFF_MAX = 20.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
 # -----------------------------
-# Helper: Evaluate a theme's claims
+# Setup Groq client (on first use)
 # -----------------------------
-def get_theme_score_and_summary(claims_list):
-    """
-    Send all claims for a theme as one block.
-    Returns:
-      - score (float 0–1)
-      - summary (list of 2 short lines)
-    """
-    if not claims_list:
-        return 0.0, []
+_client = None
+
+def get_api_key():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY is not set (environment or .env)")
+    return api_key
 
+def get_client():
+    global _client
+    if _client is None:
+        from groq import Groq
+
+        _client = Groq(api_key=get_api_key())
+    return _client
+
+# -----------------------------
+# Helper: Evaluate a theme's claims
+# -----------------------------
+def _theme_messages(claims_list):
     claims_text = "\n".join(claims_list)
 
     prompt = f"""
@@ -45,17 +80,13 @@ Claims:
 {claims_text}
 """
 
-    response = client.chat.completions.create(
-        model="moonshotai/kimi-k2-instruct-0905",
-        messages=[
-            {"role": "system", "content": "You are a precise ESG evaluation engine."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.0,
-        max_tokens=150
-    )
+    return [
+        {"role": "system", "content": "You are a precise ESG evaluation engine."},
+        {"role": "user", "content": prompt}
+    ]
 
-    text = response.choices[0].message.content.strip()
+def _parse_theme_response(text):
+    text = text.strip()
 
     try:
         data = json.loads(text)
@@ -67,6 +98,155 @@ Claims:
         print(text)
         return 0.0, []
 
+def get_theme_score_and_summary(claims_list):
+    """
+    Send all claims for a theme as one block.
+    Returns:
+      - score (float 0–1)
+      - summary (list of 2 short lines)
+    """
+    if not claims_list:
+        return 0.0, []
+
+    messages = _theme_messages(claims_list)
+
+    def ask():
+        with span("groq.request", items=1):
+            response = get_client().chat.completions.create(
+                model=GROQ_MODEL,
+                messages=messages,
+                **CHAT_PARAMS
+            )
+        return response.choices[0].message.content
+
+    if LLM_CACHE_ENABLED:
+        text = get_llm_cache().get_or_compute(
+            GROQ_MODEL, LLMCache.prompt_hash(messages, **CHAT_PARAMS), ask, cacheable=is_json
+        )
+    else:
+        text = ask()
+
+    return _parse_theme_response(text)
+
+# -----------------------------
+# Concurrent evaluation (asyncio + one pooled HTTP client)
+# -----------------------------
+def _backoff_delay(attempt, retry_after=None):
+    # Full jitter: anywhere between 0 and the exponential cap
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+async def _chat_completion(client, semaphore, messages, max_retries=GROQ_MAX_RETRIES):
+    """
+    POSTs one chat completion, retrying 429/5xx answers, timeouts and
+    connection errors with jittered exponential backoff.
+    """
+    import httpx
+
+    payload = {"model": GROQ_MODEL, "messages": messages, **CHAT_PARAMS}
+
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        async with semaphore:
+            try:
+                with span("groq.request", items=1, attempt=attempt):
+                    response = await client.post("/chat/completions", json=payload)
+            except (httpx.TimeoutException, httpx.TransportError):
+                if attempt == max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or attempt == max_retries:
+                    response.raise_for_status()
+                    return response.json()["choices"][0]["message"]["content"]
+                retry_after = response.headers.get("retry-after")
+
+        await asyncio.sleep(_backoff_delay(attempt, retry_after))
+
+async def _theme_score_async(client, semaphore, theme, claims_list):
+    if not claims_list:
+        return 0.0, []
+
+    messages = _theme_messages(claims_list)
+
+    def ask():
+        return _chat_completion(client, semaphore, messages)
+
+    if LLM_CACHE_ENABLED:
+        text = await get_llm_cache().aget_or_compute(
+            GROQ_MODEL, LLMCache.prompt_hash(messages, **CHAT_PARAMS), ask, cacheable=is_json
+        )
+    else:
+        text = await ask()
+
+    return _parse_theme_response(text)
+
+async def score_themes_async(theme_data, concurrency=GROQ_CONCURRENCY,
+                             base_url=GROQ_BASE_URL, timeout=GROQ_TIMEOUT, api_key=None):
+    """
+    Evaluates every theme concurrently (at most `concurrency` requests in flight)
+    over one keep-alive connection pool. base_url can point at any
+    OpenAI-compatible server, e.g. a local stub.
+    Like sync mode, raises if a request fails (after its retries); the other
+    themes still finish first, so their answers are cached.
+    """
+    import httpx
+
+    api_key = api_key or get_api_key()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=timeout,
+        limits=limits
+    ) as client:
+        themes = list(theme_data)
+        results = await asyncio.gather(*[
+            _theme_score_async(client, semaphore, theme, theme_data[theme].get("top_number_claims", []))
+            for theme in themes
+        ], return_exceptions=True)
+
+    failed = [(theme, r) for theme, r in zip(themes, results) if isinstance(r, BaseException)]
+    if failed:
+        names = ", ".join(theme for theme, _ in failed)
+        raise RuntimeError(f"Theme evaluation failed for {len(failed)} of {len(themes)} themes ({names})") from failed[0][1]
+
+    for theme, (score, summary) in zip(themes, results):
+        theme_data[theme]["theme_score"] = round(score, 3)
+        theme_data[theme]["theme_summary"] = summary
+        print(f"[{theme}] Score: {score:.3f}")
+
+    return theme_data
+
+# -----------------------------
+# Score theme summaries held in memory
+# -----------------------------
+def score_themes(theme_data, mode=None):
+    """
+    Adds theme_score and theme_summary to every theme in a theme_summaries dict.
+    mode is "async" (concurrent requests) or "sync"; defaults to GROQ_EVAL_MODE.
+    """
+    mode = mode or GROQ_EVAL_MODE
+
+    with span("groq.score_themes", items=len(theme_data), mode=mode):
+        if mode == "async":
+            return asyncio.run(score_themes_async(theme_data))
+
+        for theme, details in theme_data.items():
+            claims = details.get("top_number_claims", [])
+            score, summary = get_theme_score_and_summary(claims)
+            theme_data[theme]["theme_score"] = round(score, 3)
+            theme_data[theme]["theme_summary"] = summary
+            print(f"[{theme}] Score: {score:.3f}")
+
+        return theme_data
+
 # -----------------------------
 # Main function to use in frontend.py
 # -----------------------------
@@ -85,12 +265,7 @@ def evaluate_themes(input_path="claimtoclassify/theme_summaries.json",
     with open(input_path, "r", encoding="utf-8") as f:
         theme_data = json.load(f)
 
-    for theme, details in theme_data.items():
-        claims = details.get("top_number_claims", [])
-        score, summary = get_theme_score_and_summary(claims)
-        theme_data[theme]["theme_score"] = round(score, 3)
-        theme_data[theme]["theme_summary"] = summary
-        print(f"[{theme}] Score: {score:.3f}")
+    theme_data = score_themes(theme_data)
 
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(theme_data, f, indent=2, ensure_ascii=False)
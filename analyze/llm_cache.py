@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+# -----------------------------
+# Settings
+# -----------------------------
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".cache/llm")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024
+EVICT_EVERY = 100   # writes between full scans of the cache directory
+EVICT_TO = 0.9      # eviction frees space down to this share of max_bytes
+
+
+def is_json(text):
+    # Only responses that parse are cached, so a bad answer is asked again next time
+    try:
+        json.loads(text.strip())
+        return True
+    except (AttributeError, ValueError):
+        return False
+
+# -----------------------------
+# On-disk LLM response cache
+# -----------------------------
+class LLMCache:
+    """
+    Chat completion responses stored as <model>/<prompt hash>.json.
+    Entries older than ttl seconds are ignored and removed; once the cache
+    grows past max_bytes the least recently used files are removed. The size
+    is tracked as entries are written, and the directory is only scanned when
+    it crosses max_bytes or every EVICT_EVERY writes (which also picks up
+    expired entries and files written by other processes).
+    Concurrent identical requests (from any thread or event loop in this
+    process) are coalesced: one caller asks the model, the others wait for it.
+    """
+
+    def __init__(self, cache_dir=LLM_CACHE_DIR, ttl=LLM_CACHE_TTL, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.root = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+        self._size = None        # bytes on disk as of the last scan plus later writes; None until scanned
+        self._writes = 0
+        self._inflight = {}
+
+    @staticmethod
+    def prompt_hash(messages, **params) -> str:
+        text = json.dumps({"messages": messages, "params": params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, model, prompt_hash):
+        return self.root / model.replace("/", "__") / f"{prompt_hash}.json"
+
+    # ---- entries ----
+    def get(self, model, prompt_hash):
+        path = self._path(model, prompt_hash)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            created, response = entry["created"], entry["response"]
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            # Truncated or malformed: a miss, and the file is asked for again
+            path.unlink(missing_ok=True)
+            return None
+
+        if time.time() - created > self.ttl:
+            self.expired += 1
+            path.unlink(missing_ok=True)
+            return None
+
+        now = time.time()
+        os.utime(path, (now, now))
+        return response
+
+    def put(self, model, prompt_hash, response):
+        path = self._path(model, prompt_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "created": time.time(), "response": response}, f, ensure_ascii=False)
+
+        size = tmp.stat().st_size
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._writes += 1
+            if self._size is not None:
+                self._size += size
+            scan = self._size is None or self._size > self.max_bytes or self._writes >= EVICT_EVERY
+            if scan:
+                self._writes = 0
+        if scan:
+            self.evict()
+
+    # ---- lookups with single-flight ----
+    def _claim(self, model, prompt_hash):
+        """
+        Returns (cached response, None), (None, future to wait on) or
+        (None, None) when this caller has to ask the model itself.
+        """
+        key = (model, prompt_hash)
+        with self._lock:
+            cached = self.get(model, prompt_hash)
+            if cached is not None:
+                self.hits += 1
+                return cached, None
+
+            waiting = self._inflight.get(key)
+            if waiting is not None:
+                self.coalesced += 1
+                return None, waiting
+
+            self.misses += 1
+            self._inflight[key] = Future()
+            return None, None
+
+    def _finish(self, model, prompt_hash, response=None, error=None, cacheable=None):
+        with self._lock:
+            future = self._inflight.pop((model, prompt_hash))
+
+        if error is not None:
+            future.set_exception(error)
+            return
+
+        if cacheable is None or cacheable(response):
+            self.put(model, prompt_hash, response)
+        future.set_result(response)
+
+    def get_or_compute(self, model, prompt_hash, compute, cacheable=None):
+        """
+        Cached response for (model, prompt_hash), or compute() once.
+        Responses that fail cacheable(response) are returned but not stored.
+        """
+        cached, waiting = self._claim(model, prompt_hash)
+        if cached is not None:
+            return cached
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            response = compute()
+        except BaseException as e:
+            self._finish(model, prompt_hash, error=e)
+            raise
+
+        self._finish(model, prompt_hash, response, cacheable=cacheable)
+        return response
+
+    async def aget_or_compute(self, model, prompt_hash, compute, cacheable=None):
+        """
+        Async version of get_or_compute; compute() returns an awaitable.
+        """
+        cached, waiting = self._claim(model, prompt_hash)
+        if cached is not None:
+            return cached
+        if waiting is not None:
+            return await asyncio.wrap_future(waiting)
+
+        try:
+            response = await compute()
+        except BaseException as e:
+            self._finish(model, prompt_hash, error=e)
+            raise
+
+        self._finish(model, prompt_hash, response, cacheable=cacheable)
+        return response
+
+    # ---- eviction ----
+    def evict(self):
+        now = time.time()
+        files = []
+        for p in self.root.rglob("*.json"):
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                # not read within the ttl, so it is expired as well
+                p.unlink(missing_ok=True)
+            else:
+                files.append((stat.st_mtime, stat.st_size, p))
+
+        # Frees some headroom, so a full cache is not scanned again on the next write
+        total = sum(size for _, size, _ in files)
+        limit = self.max_bytes if total <= self.max_bytes else self.max_bytes * EVICT_TO
+        for _, size, p in sorted(files):
+            if total <= limit:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+        with self._lock:
+            self._size = total
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
+
+
+_cache = None
+
+def get_llm_cache():
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
@@ -1,11 +1,33 @@
 import os
 import json
-from dotenv import load_dotenv
-from groq import Groq
 
-load_dotenv()
+try:
+    from analyze.llm_cache import LLM_CACHE_ENABLED, LLMCache, get_llm_cache, is_json
+    from analyze.company_store import get_company_store
+except ImportError:   # run as a script from analyze/
+    from llm_cache import LLM_CACHE_ENABLED, LLMCache, get_llm_cache, is_json
+    from company_store import get_company_store
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+ESG_MODEL = "moonshotai/kimi-k2-instruct-0905"
+CHAT_PARAMS = {"temperature": 0.1, "max_tokens": 1000}
+
+# -----------------------------
+# Groq client (created on first use)
+# -----------------------------
+_client = None
+
+def get_client():
+    """
+    Creates the Groq client on first use (loads .env at the same time).
+    """
+    global _client
+    if _client is None:
+        from dotenv import load_dotenv
+        from groq import Groq
+
+        load_dotenv()
+        _client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _client
 
 # -----------------------------
 # Function to fetch ESG data for a company
@@ -43,45 +65,41 @@ Rules:
 - Return ONLY valid JSON. No explanations, no markdown, no extra text.
 """
 
-    response = client.chat.completions.create(
-        model="moonshotai/kimi-k2-instruct-0905",
-        messages=[
-            {"role": "system", "content": "You are a precise ESG intelligence engine."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.1,
-        max_tokens=1000
+    messages = [
+        {"role": "system", "content": "You are a precise ESG intelligence engine."},
+        {"role": "user", "content": prompt}
+    ]
+
+    def ask():
+        response = get_client().chat.completions.create(
+            model=ESG_MODEL,
+            messages=messages,
+            **CHAT_PARAMS
+        )
+        return response.choices[0].message.content
+
+    if not LLM_CACHE_ENABLED:
+        return ask()
+
+    # Sessions asking about the same company at once share one request
+    return get_llm_cache().get_or_compute(
+        ESG_MODEL, LLMCache.prompt_hash(messages, **CHAT_PARAMS), ask, cacheable=is_json
     )
 
-    return response.choices[0].message.content
-
 
-def fetch_and_save_esg(company_name: str, filename="analyze/company_data.json"):
+def fetch_and_save_esg(company_name: str, store=None):
     """
-    Fetch ESG data for a company and save/update it in company_data.json.
+    Fetch ESG data for a company and upsert it into the company store.
     """
     try:
         # Fetch ESG data
         data_str = analyze_company_esg(company_name)
         parsed_data = json.loads(data_str)  # ensures valid JSON
 
-        # Load existing file if exists
-        if os.path.exists(filename):
-            with open(filename, "r", encoding="utf-8") as f:
-                try:
-                    existing_data = json.load(f)
-                except json.JSONDecodeError:
-                    existing_data = {}
-        else:
-            existing_data = {}
-
-        # Save/update company data
-        existing_data[company_name] = parsed_data
-
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, indent=4)
+        store = store or get_company_store()
+        store.upsert(company_name, parsed_data)
 
-        print(f"✅ ESG data for '{company_name}' saved to {filename}")
+        print(f"✅ ESG data for '{company_name}' saved to the company store")
 
     except Exception as e:
         print(f"⚠️ Failed to fetch ESG data for '{company_name}': {e}")
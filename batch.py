@@ -0,0 +1,248 @@
+"""
+Batch analysis of many reports.
+
+    python batch.py <directory | manifest> [--out batch_output] [--workers N] [--no-cache]
+
+The input is a directory (searched recursively for .pdf files) or a manifest:
+a text file with one PDF path per line, or a CSV file with a "path" column.
+Every report goes through the local pipeline (extraction, assertiveness,
+theming, summaries) on a process pool. Outputs:
+
+  <out>/reports/<report id>/   the same JSON files a single run writes
+  <out>/checkpoint.jsonl       one line per finished report (resume log)
+  <out>/summary.csv            one row per report
+
+Reports already in the checkpoint (matched by file hash) are skipped, so
+rerunning the same command after a crash continues where it stopped.
+Reports that failed are retried.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pipeline
+from result_cache import file_sha256
+
+BATCH_OUTPUT = "batch_output"
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+
+SUMMARY_FIELDS = [
+    "report_id", "path", "sha256", "status", "claims", "avg_assertiveness",
+    "performance_claims", "future_claims", "qualitative_claims",
+    "vague_words_score", "vague_density", "difficulty_to_read_score",
+    "flesch_reading_ease", "removed_text_percent", "themes", "top_theme", "top_theme_density_percent",
+    "seconds", "error"
+]
+
+# -----------------------------
+# Inputs
+# -----------------------------
+def list_reports(source):
+    """
+    PDF paths from a directory or a manifest file, in a stable order.
+    """
+    source = Path(source)
+    if source.is_dir():
+        return sorted(str(p) for p in source.rglob("*") if p.suffix.lower() == ".pdf")
+
+    base = source.parent
+    if source.suffix.lower() == ".csv":
+        with open(source, newline="", encoding="utf-8") as f:
+            paths = [row["path"].strip() for row in csv.DictReader(f) if row.get("path", "").strip()]
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            paths = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    # relative manifest entries are relative to the manifest
+    return [str(p if Path(p).is_absolute() else base / p) for p in paths]
+
+
+def report_id(path, pdf_hash):
+    return f"{Path(path).stem}-{pdf_hash[:10]}"
+
+# -----------------------------
+# Checkpoint
+# -----------------------------
+def load_checkpoint(path):
+    """
+    Latest checkpoint row per file hash.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue   # a line cut short by a crash
+            done[row["sha256"]] = row
+    return done
+
+
+def append_checkpoint(path, row):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+# -----------------------------
+# Worker
+# -----------------------------
+def _init_worker(workers):
+    import pdf_reader
+
+    # The pool is the parallelism: no nested PDF pools, and a fair share of CPU threads.
+    # Threads are set before loading, since the ONNX session sizes itself from torch.
+    pdf_reader.PDF_WORKERS = 1
+
+    import torch
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+
+    pipeline.load_models()
+
+
+def summarize_report(results):
+    from assertiveness import compute_assertiveness_scores
+
+    row = {
+        "claims": len(results["claims"]),
+        "vague_words_score": results["vague_words_score"]["vague_words_score"],
+        "vague_density": results["vague_words_score"]["vague_density"],
+        "difficulty_to_read_score": results["difficulty_score"]["difficulty_to_read_score"],
+        "flesch_reading_ease": results["difficulty_score"]["flesch_reading_ease"],
+        "themes": len(results["theme_metrics"])
+    }
+
+    if results["text_cleanup"]:
+        row["removed_text_percent"] = results["text_cleanup"]["removed_percent"]
+
+    if results["scored_claims"]:
+        _, types, avg = compute_assertiveness_scores(results["scored_claims"])
+        row["avg_assertiveness"] = avg
+        for claim_type, count in types.items():
+            row[f"{claim_type}_claims"] = count
+
+    if results["theme_metrics"]:
+        top_theme, metrics = max(results["theme_metrics"].items(), key=lambda kv: kv[1]["claim_count"])
+        row["top_theme"] = top_theme
+        row["top_theme_density_percent"] = metrics["claim_density_percent"]
+
+    return row
+
+
+def process_report(path, pdf_hash, output_dir, use_cache=True):
+    """
+    Runs the local pipeline on one PDF and writes its outputs to output_dir.
+    Returns its summary row; failures are returned as a row too.
+    """
+    start = time.perf_counter()
+    row = {"report_id": report_id(path, pdf_hash), "path": path, "sha256": pdf_hash}
+
+    try:
+        results = pipeline.run_pdf_analysis(path, use_cache=use_cache)
+        pipeline.save_results(results, output_dir)
+        row.update(summarize_report(results))
+        row["status"] = "ok"
+    except Exception as e:
+        row["status"] = "error"
+        row["error"] = f"{type(e).__name__}: {e}"
+
+    row["seconds"] = round(time.perf_counter() - start, 2)
+    return row
+
+# -----------------------------
+# Batch run
+# -----------------------------
+def write_summary(path, rows):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for row in sorted(rows, key=lambda r: r["path"]):
+            writer.writerow(row)
+    os.replace(tmp, path)
+
+
+def run_batch(source, output_dir=BATCH_OUTPUT, workers=BATCH_WORKERS, use_cache=True):
+    output_dir = Path(output_dir)
+    reports_dir = output_dir / "reports"
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output_dir / "checkpoint.jsonl"
+
+    paths = list_reports(source)
+    done = load_checkpoint(checkpoint_path)
+
+    todo = []
+    seen = set()
+    for path in paths:
+        pdf_hash = file_sha256(path)
+        if pdf_hash in seen:
+            continue
+        seen.add(pdf_hash)
+        if done.get(pdf_hash, {}).get("status") != "ok":
+            todo.append((path, pdf_hash))
+
+    print(f"📄 {len(seen)} reports, {len(seen) - len(todo)} already done, {len(todo)} to run on {workers} workers")
+
+    start = time.perf_counter()
+    finished = 0
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers,)) as pool:
+            futures = {
+                pool.submit(process_report, path, pdf_hash,
+                            str(reports_dir / report_id(path, pdf_hash)), use_cache): (path, pdf_hash)
+                for path, pdf_hash in todo
+            }
+
+            for future in as_completed(futures):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    # The worker died (BrokenProcessPool) or failed outside process_report
+                    path, pdf_hash = futures[future]
+                    row = {"report_id": report_id(path, pdf_hash), "path": path, "sha256": pdf_hash,
+                           "status": "error", "error": f"{type(e).__name__}: {e}", "seconds": 0.0}
+                append_checkpoint(checkpoint_path, row)
+                done[row["sha256"]] = row
+                finished += 1
+
+                per_hour = finished / (time.perf_counter() - start) * 3600
+                mark = "✅" if row["status"] == "ok" else f"⚠️ {row['error']}"
+                print(f"[{finished}/{len(todo)}] {row['report_id']} {mark} "
+                      f"({row['seconds']}s) | {per_hour:,.0f} reports/hour")
+
+    elapsed = time.perf_counter() - start
+    rows = [done[h] for h in seen if h in done]
+    write_summary(output_dir / "summary.csv", rows)
+
+    failed = sum(1 for r in rows if r["status"] != "ok")
+    per_hour = finished / elapsed * 3600 if finished and elapsed > 0 else 0.0
+    print(f"📊 {finished} reports in {elapsed:.1f}s ({per_hour:,.0f} reports/hour), {failed} failed")
+    print(f"✅ Summary saved to {output_dir / 'summary.csv'}")
+
+    return {"reports": len(seen), "ran": finished, "failed": failed,
+            "seconds": round(elapsed, 2), "reports_per_hour": round(per_hour, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse a directory or manifest of PDF reports.")
+    parser.add_argument("source", help="directory of PDFs, or a .txt/.csv manifest")
+    parser.add_argument("--out", default=BATCH_OUTPUT, help="output directory")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="worker processes")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the result cache")
+    args = parser.parse_args()
+
+    summary = run_batch(args.source, args.out, args.workers, use_cache=not args.no_cache)
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
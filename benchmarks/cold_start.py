@@ -0,0 +1,118 @@
+"""
+Cold-start benchmark.
+
+Every entry point is measured in a fresh Python process:
+  - import time: how long the module takes to import
+  - first request: how long the first real call takes (model / client loads included)
+
+Usage:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --only pipeline sum_class
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLE_SENTENCES = [
+    "We reduced Scope 1 and 2 emissions by 42% against our 2019 baseline.",
+    "We aim to reach net zero across our value chain by 2040.",
+]
+
+# name -> (import statement, first request)
+ENTRY_POINTS = {
+    "frontend": (
+        "import streamlit, pandas, pipeline",
+        "pipeline.load_models()",
+    ),
+    "pipeline": (
+        "import pipeline",
+        "pipeline.load_models()",
+    ),
+    "claims_extractor": (
+        "import run_pdf_claims_extractor, extract_claims",
+        f"extract_claims.classify_sentences({SAMPLE_SENTENCES!r})",
+    ),
+    "sum_class": (
+        "import sum_class",
+        f"sum_class.textrank_scores({SAMPLE_SENTENCES!r})",
+    ),
+    "getting_accuracy": (
+        "from analyze import getting_accuracy",
+        "getting_accuracy.get_client()",
+    ),
+    "scrapper": (
+        "from analyze import scrapper",
+        "scrapper.get_client()",
+    ),
+}
+
+CHILD_TEMPLATE = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+t0 = time.perf_counter()
+{import_stmt}
+t1 = time.perf_counter()
+try:
+    {first_request}
+    error = None
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+t2 = time.perf_counter()
+print(json.dumps({{"import_s": t1 - t0, "first_request_s": t2 - t1, "error": error}}))
+"""
+
+
+def measure(name):
+    import_stmt, first_request = ENTRY_POINTS[name]
+    code = CHILD_TEMPLATE.format(
+        paths=[str(ROOT), str(ROOT / "claims_extractor"),
+               str(ROOT / "claim_scorer"), str(ROOT / "claimtoclassify")],
+        import_stmt=import_stmt,
+        first_request=first_request,
+    )
+
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+    if proc.returncode != 0:
+        last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+        return {"import_s": None, "first_request_s": None, "error": last_line}
+
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and first-request latency.")
+    parser.add_argument("--only", nargs="*", choices=list(ENTRY_POINTS), help="entry points to measure")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    names = args.only or list(ENTRY_POINTS)
+    results = {}
+
+    print(f"{'Entry point':<20} {'Import (s)':>11} {'First request (s)':>18}")
+    for name in names:
+        r = measure(name)
+        results[name] = r
+
+        imp = f"{r['import_s']:.3f}" if r["import_s"] is not None else "-"
+        first = f"{r['first_request_s']:.3f}" if r["first_request_s"] is not None else "-"
+        print(f"{name:<20} {imp:>11} {first:>18}")
+        if r["error"]:
+            print(f"  ⚠️ {r['error']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Per-stage micro-benchmarks.
+
+Each stage runs on a synthetic report (benchmarks/synthetic_report.py) and is
+timed over several repeats. Peak Python memory is measured in one extra run
+under tracemalloc. By default everything runs offline: the classifier is a
+tiny randomly initialised DistilBERT and the word vectors are random, both
+built in a temporary directory. Use --real-models to benchmark the trained
+./claim_classifier and the en_core_web_md vectors instead.
+
+Caches (claim probabilities, sentence vectors) are fresh in-memory
+databases for every repeat, so each run does the full work.
+
+Usage:
+    python benchmarks/micro.py
+    python benchmarks/micro.py --pages 100 --claim-density 0.5 --only textrank_scores
+    python benchmarks/micro.py --save-baseline
+    python benchmarks/micro.py --threshold 0.25      # exit 1 on regressions
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "claims_extractor"), str(ROOT / "claim_scorer"),
+                str(ROOT / "claimtoclassify"), str(Path(__file__).resolve().parent)]
+
+import synthetic_report
+
+BASELINE_PATH = ROOT / "benchmarks" / "baseline.json"
+REGRESSION_THRESHOLD = 0.2   # 20% slower (or more memory) than the baseline
+REPEATS = 5
+TEXTRANK_LIMIT = 500         # PageRank is O(n^2), so it gets at most this many claims
+
+# Tiny classifier (randomly initialised, same architecture as the real one)
+TINY_DIM = 32
+TINY_LAYERS = 2
+TINY_HEADS = 2
+TINY_VECTOR_DIM = 50
+
+# -----------------------------
+# Offline models
+# -----------------------------
+def build_tiny_classifier(path):
+    """
+    Saves a randomly initialised DistilBERT and a WordPiece tokenizer whose
+    vocabulary covers the synthetic report, so the tokenizer work is realistic.
+    """
+    import torch
+    from transformers import DistilBertConfig, DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    words = {w.strip(".,%()").lower() for w in synthetic_report.vocabulary()}
+    chars = sorted({c for w in words for c in w} | set("0123456789.,%()-"))
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + [f"##{c}" for c in chars]
+    vocab += sorted(w for w in words if w and w not in vocab)
+
+    with open(path / "vocab.txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab) + "\n")
+    DistilBertTokenizerFast(vocab_file=str(path / "vocab.txt")).save_pretrained(path)
+
+    torch.manual_seed(0)
+    config = DistilBertConfig(
+        vocab_size=len(vocab), dim=TINY_DIM, hidden_dim=4 * TINY_DIM,
+        n_layers=TINY_LAYERS, n_heads=TINY_HEADS, num_labels=2
+    )
+    DistilBertForSequenceClassification(config).save_pretrained(path)
+    return path
+
+
+def build_random_vectors(model_name, vector_dir, dim=TINY_VECTOR_DIM):
+    """
+    Writes a vector table (vector_table.py format) of random vectors for the
+    words of the synthetic report.
+    """
+    import numpy as np
+    from vector_table import _key, table_dir, tokenize
+
+    tokens = set()
+    for sentence in synthetic_report.generate_sentences(2000, claim_density=0.5):
+        tokens.update(tokenize(sentence))
+
+    keys = np.array(sorted(_key(t) for t in tokens), dtype=np.uint64)
+    rng = np.random.default_rng(0)
+
+    out = table_dir(model_name, vector_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    np.save(out / "vectors.npy", rng.standard_normal((len(keys), dim)).astype(np.float32))
+    np.save(out / "keys.npy", keys)
+    np.save(out / "rows.npy", np.arange(len(keys), dtype=np.int64))
+    with open(out / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"model": model_name, "vectors_length": dim, "keys": len(keys), "version": "benchmark"}, f)
+
+
+def setup_models(workdir, real_models=False):
+    import extract_claims
+    import sum_class
+
+    if real_models:
+        extract_claims.MODEL_PATH = str(ROOT / "claim_classifier")
+        return
+
+    extract_claims.MODEL_PATH = str(build_tiny_classifier(Path(workdir) / "claim_classifier"))
+
+    import vector_table
+    vector_table.VECTOR_DIR = str(Path(workdir) / "vectors")
+    build_random_vectors(sum_class.SPACY_MODEL, vector_table.VECTOR_DIR)
+    sum_class.VECTOR_BACKEND = "mmap"
+    sum_class._vector_table = vector_table.open_table(sum_class.SPACY_MODEL, vector_table.VECTOR_DIR)
+
+# -----------------------------
+# Stages
+# -----------------------------
+def _fresh_caches():
+    """
+    New in-memory caches, so the claim and vector caches never hide the work.
+    """
+    import extract_claims
+    import sum_class
+    from claim_prob_cache import ClaimProbCache
+    from vector_table import SentenceVectorCache
+
+    extract_claims._prob_cache = ClaimProbCache(extract_claims.backend_version(), ":memory:")
+    if sum_class.VECTOR_BACKEND != "spacy":
+        sum_class._vector_cache = SentenceVectorCache(sum_class.get_vector_table().version, ":memory:")
+
+
+def build_stages(text, sentences, claims):
+    """
+    name -> (function to time, number of items it handles).
+    """
+    from sentence_splitter import split_into_sentences
+    from vague_words import calculate_vague_words_score
+    from extract_claims import classify_sentences, is_claim
+    from assertiveness import process_claims
+    from sum_class import textrank_scores
+
+    ranked = [c["sentence"] for c in claims[:TEXTRANK_LIMIT]]
+
+    return {
+        "split_into_sentences": (lambda: split_into_sentences(text), len(sentences)),
+        "calculate_vague_words_score": (lambda: calculate_vague_words_score(text), len(sentences)),
+        "is_claim": (lambda: [is_claim(s) for s in sentences[:200]], min(len(sentences), 200)),
+        "classify_sentences": (lambda: classify_sentences(sentences), len(sentences)),
+        "process_claims": (lambda: process_claims([dict(c) for c in claims]), len(claims)),
+        "textrank_scores": (lambda: textrank_scores(ranked), len(ranked)),
+    }
+
+
+def measure(func, items, repeats=REPEATS):
+    """
+    Median wall time over repeats (after one warm-up run) and the
+    tracemalloc peak of a separate run.
+    """
+    _fresh_caches()
+    func()   # warm-up: model loads, regex compilation, page cache
+
+    times = []
+    for _ in range(repeats):
+        _fresh_caches()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    _fresh_caches()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = statistics.median(times)
+    return {
+        "items": items,
+        "seconds": round(seconds, 6),
+        "items_per_s": round(items / seconds, 1) if seconds > 0 else None,
+        "peak_mb": round(peak / 1024 / 1024, 3)
+    }
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Stages that got slower, or used more memory, than the baseline by more than threshold.
+    """
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if base[metric] and r[metric] > base[metric] * (1 + threshold):
+                regressions.append((name, metric, base[metric], r[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on a synthetic report.")
+    parser.add_argument("--pages", type=int, default=20, help="synthetic report pages")
+    parser.add_argument("--claim-density", type=float, default=synthetic_report.CLAIM_DENSITY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--only", nargs="*", help="stages to run")
+    parser.add_argument("--real-models", action="store_true", help="use ./claim_classifier and en_core_web_md")
+    parser.add_argument("--backend", choices=("torch", "int8", "onnx", "onnx-int8"),
+                        help="classifier backend (default CLAIM_BACKEND)")
+    parser.add_argument("--pdf", action="store_true", help="read the report from a generated PDF (times PyPDF2 too)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_models(workdir, args.real_models)
+        if args.backend:
+            import extract_claims
+            extract_claims.CLAIM_BACKEND = args.backend
+
+        pages = synthetic_report.generate_pages(args.pages, claim_density=args.claim_density, seed=args.seed)
+        text = "\n".join(pages)
+        extra = {}
+        if args.pdf:
+            from pdf_reader import extract_text_from_pdf
+            pdf_path = synthetic_report.write_pdf(os.path.join(workdir, "report.pdf"), pages)
+            text = extract_text_from_pdf(pdf_path)
+            extra["extract_text_from_pdf"] = (lambda: extract_text_from_pdf(pdf_path), args.pages)
+
+        from sentence_splitter import split_into_sentences
+        from extract_claims import classify_sentences
+        sentences = split_into_sentences(text)
+
+        # Claims for the scoring stages come from a template-aware split, so the
+        # claim density is the requested one even though the tiny model is random
+        claim_like = set(synthetic_report.generate_sentences(
+            args.pages * synthetic_report.SENTENCES_PER_PAGE, 1.0, args.seed))
+        probs = classify_sentences(sentences, use_cache=False)
+        claims = [
+            {"sentence": s, "confidence": round(p, 3)}
+            for s, p in zip(sentences, probs)
+            if " ".join(s.split()) in claim_like or args.real_models and p >= 0.6
+        ]
+
+        stages = {**extra, **build_stages(text, sentences, claims)}
+        names = args.only or list(stages)
+
+        config = {
+            "pages": args.pages, "claim_density": args.claim_density, "seed": args.seed,
+            "sentences": len(sentences), "claims": len(claims),
+            "models": "real" if args.real_models else "tiny",
+            "backend": sys.modules["extract_claims"].CLAIM_BACKEND,
+            "python": platform.python_version(), "machine": platform.machine()
+        }
+        print(f"📄 {args.pages} pages, {len(sentences)} sentences, {len(claims)} claims "
+              f"({config['models']} models)")
+
+        results = {}
+        print(f"{'Stage':<30} {'Items':>7} {'Median (s)':>11} {'Items/s':>12} {'Peak (MB)':>10}")
+        for name in names:
+            func, items = stages[name]
+            r = measure(func, items, args.repeats)
+            results[name] = r
+            print(f"{name:<30} {items:>7} {r['seconds']:>11.4f} {r['items_per_s'] or 0:>12,.1f} {r['peak_mb']:>10.2f}")
+
+    report = {"config": config, "stages": results}
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline first)")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    different = {k for k in config if k != "claims" and baseline.get("config", {}).get(k) != config[k]}
+    if different:
+        print(f"⚠️ Baseline was recorded with different settings ({', '.join(sorted(different))}); "
+              f"the comparison may not be meaningful")
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, metric, before, after in regressions:
+        print(f"⚠️ {name}: {metric} {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+
+    if regressions:
+        sys.exit(1)
+    print(f"✅ No stage regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
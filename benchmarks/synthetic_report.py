@@ -0,0 +1,187 @@
+"""
+Synthetic sustainability-report generator for benchmarks.
+
+Produces report-like text (claims mixed with narrative filler) of any size,
+either as page strings or as a PDF that PyPDF2 can read. The output only
+depends on the seed, so benchmark runs are comparable.
+
+Usage:
+    python benchmarks/synthetic_report.py report.pdf --pages 60 --claim-density 0.3
+"""
+import argparse
+import random
+
+SENTENCES_PER_PAGE = 40
+CLAIM_DENSITY = 0.3
+LINE_WIDTH = 95         # characters per PDF line
+LINES_PER_PAGE = 64     # what fits on an A4 page at 12pt leading
+
+# -----------------------------
+# Sentence templates
+# -----------------------------
+CLAIM_TEMPLATES = [
+    "We reduced Scope {scope} emissions by {pct}% compared to our {base} baseline.",
+    "Our {site} sites now run on {pct}% renewable electricity.",
+    "We are committed to achieving net zero {scope_text} emissions by {year}.",
+    "We aim to cut water consumption by {pct}% across all {site} operations by {year}.",
+    "In {recent}, we recycled {pct}% of the waste generated at our {site} facilities.",
+    "We will phase out single-use plastic packaging from every product line by {year}.",
+    "Our {site} fleet is fully transitioning to electric vehicles, cutting fuel use by {pct}%.",
+    "We always source {material} responsibly and guarantee zero deforestation in our supply chain.",
+    "Energy intensity per unit of production decreased by {pct}% in {recent}.",
+    "We plan to restore {amount} hectares of biodiversity habitat near our {site} sites by {year}.",
+    "Our science-based targets commit us to a {pct}% absolute reduction in greenhouse gas emissions by {year}.",
+    "We have eliminated hazardous chemicals from {pct}% of our {site} manufacturing processes.",
+]
+
+FILLER_TEMPLATES = [
+    "This report covers the activities of the group for the financial year ending {recent}.",
+    "The Board reviews the sustainability strategy at least twice a year.",
+    "Further information is available in the appendix on page {page}.",
+    "Figures for {recent} have been restated to reflect the acquisition of two {site} subsidiaries.",
+    "The following section describes how the company engages with its stakeholders.",
+    "Our reporting follows the GRI Standards and the recommendations of the TCFD.",
+    "The audit committee met {count} times during the year to discuss risk management.",
+    "Employees across {count} countries took part in the annual engagement survey.",
+    "Table {count} summarises the key performance indicators for the reporting period.",
+    "The chief executive officer letter opens this year's report.",
+    "Data in this section were collected from {count} {site} sites and consolidated centrally.",
+    "Definitions of the terms used in this report are given in the glossary.",
+]
+
+FILLS = {
+    "scope": ["1", "2", "3", "1 and 2"],
+    "scope_text": ["operational", "value chain", "Scope 3", "carbon"],
+    "site": ["European", "Asian", "North American", "manufacturing", "retail", "logistics"],
+    "material": ["palm oil", "cotton", "timber", "soy", "cocoa"],
+    "pct": [str(n) for n in range(5, 100, 3)],
+    "year": [str(y) for y in range(2025, 2051, 5)],
+    "base": [str(y) for y in range(2010, 2021)],
+    "recent": [str(y) for y in range(2019, 2025)],
+    "amount": ["500", "1,200", "3,000", "10,000"],
+    "count": [str(n) for n in range(2, 40)],
+    "page": [str(n) for n in range(10, 120)],
+}
+
+# -----------------------------
+# Text
+# -----------------------------
+def _fill(template, rng):
+    return template.format(**{key: rng.choice(values) for key, values in FILLS.items()})
+
+
+def generate_sentences(n_sentences, claim_density=CLAIM_DENSITY, seed=0):
+    """
+    n_sentences sentences, of which about claim_density are claim-like.
+    """
+    rng = random.Random(seed)
+    return [
+        _fill(rng.choice(CLAIM_TEMPLATES if rng.random() < claim_density else FILLER_TEMPLATES), rng)
+        for _ in range(n_sentences)
+    ]
+
+
+def generate_pages(n_pages, sentences_per_page=SENTENCES_PER_PAGE, claim_density=CLAIM_DENSITY, seed=0):
+    """
+    Page strings with sentences wrapped into lines, like text read from a PDF.
+    """
+    sentences = generate_sentences(n_pages * sentences_per_page, claim_density, seed)
+    pages = []
+    for start in range(0, len(sentences), sentences_per_page):
+        pages.append("\n".join(_wrap(" ".join(sentences[start:start + sentences_per_page]))))
+    return pages
+
+
+def generate_text(n_pages, sentences_per_page=SENTENCES_PER_PAGE, claim_density=CLAIM_DENSITY, seed=0):
+    return "\n".join(generate_pages(n_pages, sentences_per_page, claim_density, seed))
+
+
+def vocabulary():
+    """
+    Every word the generator can produce (used to build the benchmark tokenizer).
+    """
+    words = set()
+    for text in CLAIM_TEMPLATES + FILLER_TEMPLATES + [v for values in FILLS.values() for v in values]:
+        words.update(text.replace("{", " ").replace("}", " ").split())
+    return sorted(words)
+
+
+def _wrap(text, width=LINE_WIDTH):
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+# -----------------------------
+# PDF
+# -----------------------------
+def _escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """
+    Minimal uncompressed PDF (Helvetica, one text block per page).
+    Pages longer than LINES_PER_PAGE lines are continued on extra pages.
+    """
+    page_lines = []
+    for page in pages:
+        lines = page.split("\n")
+        for start in range(0, max(len(lines), 1), LINES_PER_PAGE):
+            page_lines.append(lines[start:start + LINES_PER_PAGE])
+
+    # 1: font, 2: page tree, then a content stream and a page object per page
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", b""]
+    kids = []
+    for lines in page_lines:
+        stream = "BT /F1 10 Tf 40 800 Td 12 TL\n" + "".join(f"({_escape(l)}) '\n" for l in lines) + "ET"
+        data = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 1 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids)
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic sustainability report PDF.")
+    parser.add_argument("output", help="PDF file to write")
+    parser.add_argument("--pages", type=int, default=20, help="report pages")
+    parser.add_argument("--sentences-per-page", type=int, default=SENTENCES_PER_PAGE)
+    parser.add_argument("--claim-density", type=float, default=CLAIM_DENSITY, help="share of claim sentences")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pages = generate_pages(args.pages, args.sentences_per_page, args.claim_density, args.seed)
+    write_pdf(args.output, pages)
+    print(f"✅ {args.pages} pages saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Theme classification parity check.
+
+Compares sum_class.classify_claims (token matcher) with the original
+substring matcher on a claims.json file and on a few fixed sentences
+(plurals, compounds, unit prefixes, and the false positives the token
+matcher exists to avoid). Exits with status 1 on any unexpected difference.
+
+Usage:
+    python benchmarks/theme_parity.py
+    python benchmarks/theme_parity.py --claims claims_extractor/claims.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "claimtoclassify"))
+
+import sum_class
+
+# sentence -> theme the token matcher must give (plurals and compounds as
+# before; "window" and "21.5" are the substring matcher's false positives)
+FIXED_CASES = {
+    "We cut single-use plastics by 40%.": "Waste & Circularity",
+    "Waste was diverted from incineration and landfills.": "Waste & Circularity",
+    "Reduction of 161,691 tCO2e from our base year.": "GHG Emissions",
+    "In-situ groundwater makes up 1.2% of our freshwater use.": "Water & Effluents",
+    "Our renewables now cover half of our sites.": "Energy & Renewables",
+    "Offices now open every window for ventilation.": sum_class.OTHER_THEME,
+    "Revenue reached 21.5 billion this year.": sum_class.OTHER_THEME,
+}
+
+
+def substring_classify(sentence):
+    # The matcher sum_class used before the token matcher
+    text = sentence.lower()
+    scores = {theme: sum(1 for kw in keywords if kw in text) for theme, keywords in sum_class.ENV_THEMES.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else sum_class.OTHER_THEME
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check theme classification against the substring matcher.")
+    parser.add_argument("--claims", default=str(ROOT / "claims_extractor" / "claims.json"))
+    args = parser.parse_args()
+
+    with open(args.claims, "r", encoding="utf-8") as f:
+        sentences = [c["sentence"] for c in json.load(f)]
+
+    failures = 0
+    for sentence, got in zip(sentences, sum_class.classify_claims(sentences)):
+        expected = substring_classify(sentence)
+        if got != expected:
+            failures += 1
+            print(f"⚠️ {expected} -> {got}: {sentence[:120]!r}")
+    print(f"📊 {args.claims}: {len(sentences) - failures}/{len(sentences)} claims classified as before")
+
+    fixed = list(FIXED_CASES)
+    for sentence, got in zip(fixed, sum_class.classify_claims(fixed)):
+        if got != FIXED_CASES[sentence]:
+            failures += 1
+            print(f"⚠️ expected {FIXED_CASES[sentence]}, got {got}: {sentence!r}")
+
+    if failures:
+        sys.exit(1)
+    print("✅ Theme classification matches")
+
+
+if __name__ == "__main__":
+    main()
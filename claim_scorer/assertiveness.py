@@ -1,5 +1,6 @@
 import json
 import re
+import sys
 
 
 ABSOLUTE_TERMS = [
@@ -26,40 +27,156 @@ PERFORMANCE_PATTERN = re.compile(
     re.IGNORECASE | re.VERBOSE
 )
 
-def claim_assertiveness_score(sentence, confidence):
-    s = sentence.lower()
+CONFIDENCE_WEIGHT = 0.6
+LANGUAGE_WEIGHT = 0.4
+
+# -----------------------------
+# Compiled term matchers (whole words / phrases only)
+# -----------------------------
+def _terms_pattern(terms):
+    # Longest first, so "aims" is not read as "aim"; lookarounds also work for "100%"
+    alternation = "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+    return re.compile(r"(?<!\w)(?:" + alternation + r")(?!\w)", re.IGNORECASE)
+
+ABSOLUTE_PATTERN = _terms_pattern(ABSOLUTE_TERMS)
+QUALIFIER_PATTERN = _terms_pattern(QUALIFIER_TERMS)
+FUTURE_PATTERN = _terms_pattern(FUTURE_TERMS)
+
+
+def _distinct_hits(pattern, sentence):
+    return len({m.lower() for m in pattern.findall(sentence)})
 
-    absolute_hits = sum(1 for w in ABSOLUTE_TERMS if w in s)
-    qualifier_hits = sum(1 for w in QUALIFIER_TERMS if w in s)
+
+def claim_assertiveness_score(sentence, confidence):
+    absolute_hits = _distinct_hits(ABSOLUTE_PATTERN, sentence)
+    qualifier_hits = _distinct_hits(QUALIFIER_PATTERN, sentence)
 
     language_score = absolute_hits - qualifier_hits
     language_score = max(-2, min(language_score, 2))
 
     language_strength = (language_score + 2) / 4
-    final_score = (0.6 * confidence) + (0.4 * language_strength)
+    final_score = (CONFIDENCE_WEIGHT * confidence) + (LANGUAGE_WEIGHT * language_strength)
 
     return round(final_score, 3)
 
 
 def classify_claim_type(sentence):
-    s = sentence.lower()
-
     if PERFORMANCE_PATTERN.search(sentence):
         return "performance"
 
-    if any(word in s for word in FUTURE_TERMS):
+    if FUTURE_PATTERN.search(sentence):
         return "future"
 
     return "qualitative"
 
 
+# -----------------------------
+# Batch scoring for whole claim sets
+# -----------------------------
+CORPUS_SEPARATOR = "\x00"   # never matched by any pattern, acts like a string edge
+
+# All three term lists in one lowercase matcher, so the corpus is scanned once
+TERM_CATEGORIES = {}
+for _category, _terms in (("absolute", ABSOLUTE_TERMS), ("qualifier", QUALIFIER_TERMS), ("future", FUTURE_TERMS)):
+    for _term in _terms:
+        TERM_CATEGORIES.setdefault(_term.lower(), set()).add(_category)
+
+ALL_TERMS_PATTERN = re.compile(
+    r"(?<!\w)(?:" + "|".join(re.escape(t) for t in sorted(TERM_CATEGORIES, key=len, reverse=True)) + r")(?!\w)"
+)
+
+# Same matches as PERFORMANCE_PATTERN; the lookahead skips positions that cannot start one
+PERFORMANCE_SCAN = re.compile(
+    r"(?=[\d€$₹tkmg])(?:" + PERFORMANCE_PATTERN.pattern + ")",
+    re.IGNORECASE | re.VERBOSE
+)
+
+
+def _hit_sentence_ids(pattern, corpus, starts):
+    """
+    Runs the pattern once over the joined corpus.
+    Returns the sentence index and matched text of every hit.
+    """
+    import numpy as np
+
+    positions, matched = [], []
+    for m in pattern.finditer(corpus):
+        positions.append(m.start())
+        matched.append(m.group(0))
+
+    ids = np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side="right") - 1
+    return ids, matched
+
+
+def _distinct_hit_counts(ids, matched, category, n):
+    import numpy as np
+
+    pairs = {(i, t) for i, t in zip(ids.tolist(), matched) if category in TERM_CATEGORIES[t]}
+    return np.bincount(np.fromiter((i for i, _ in pairs), dtype=np.int64, count=len(pairs)), minlength=n)
+
+
+def score_claims_batch(sentences, confidences,
+                       confidence_weight=CONFIDENCE_WEIGHT,
+                       language_weight=LANGUAGE_WEIGHT):
+    """
+    Scores many claims at once. The sentences are joined into one lowercase
+    corpus, the term matcher and the performance matcher each run over it once,
+    and the score arithmetic is done on NumPy arrays.
+    Returns a DataFrame with absolute_hits, qualifier_hits,
+    assertiveness_score and claim_type (same values as the per-claim functions).
+    """
+    import numpy as np
+    import pandas as pd
+
+    sentences = [s.lower().replace(CORPUS_SEPARATOR, " ") for s in sentences]
+    confidence = np.asarray(confidences, dtype=float)
+    n = len(sentences)
+
+    lengths = np.fromiter((len(s) + 1 for s in sentences), dtype=np.int64, count=n)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    corpus = CORPUS_SEPARATOR.join(sentences)
+
+    term_ids, terms = _hit_sentence_ids(ALL_TERMS_PATTERN, corpus, starts)
+    absolute_hits = _distinct_hit_counts(term_ids, terms, "absolute", n)
+    qualifier_hits = _distinct_hit_counts(term_ids, terms, "qualifier", n)
+
+    is_future = np.zeros(n, dtype=bool)
+    is_future[[i for i, t in zip(term_ids.tolist(), terms) if "future" in TERM_CATEGORIES[t]]] = True
+
+    perf_ids, _ = _hit_sentence_ids(PERFORMANCE_SCAN, corpus, starts)
+    is_performance = np.zeros(n, dtype=bool)
+    is_performance[perf_ids] = True
+
+    language_score = np.clip(absolute_hits - qualifier_hits, -2, 2)
+    language_strength = (language_score + 2) / 4
+    final_score = np.round(confidence_weight * confidence + language_weight * language_strength, 3)
+
+    claim_type = np.select(
+        [is_performance, is_future],
+        ["performance", "future"],
+        default="qualitative"
+    )
+
+    return pd.DataFrame({
+        "absolute_hits": absolute_hits.astype(int),
+        "qualifier_hits": qualifier_hits.astype(int),
+        "assertiveness_score": final_score,
+        "claim_type": claim_type
+    })
+
+
 def process_claims(claims):
-    for claim in claims:
-        sentence = claim["sentence"]
-        confidence = claim["confidence"]
+    if not claims:
+        return claims
+
+    scored = score_claims_batch(
+        [claim["sentence"] for claim in claims],
+        [claim["confidence"] for claim in claims]
+    )
 
-        claim["assertiveness_score"] = claim_assertiveness_score(sentence, confidence)
-        claim["claim_type"] = classify_claim_type(sentence)
+    for claim, score, claim_type in zip(claims, scored["assertiveness_score"], scored["claim_type"]):
+        claim["assertiveness_score"] = float(score)
+        claim["claim_type"] = str(claim_type)
 
     return claims
 
@@ -78,32 +195,46 @@ def compute_assertiveness_scores(claims):
     return len(scores), types, round(sum(scores) / len(scores), 3)
 
 
+# -----------------------------
+# Summary of a scored claim set
+# -----------------------------
+def summarize_assertiveness(claims):
+    len_claims, types, avg_score = compute_assertiveness_scores(claims)
+    return {
+        "average_assertiveness_score": avg_score,
+        "claim_type_distribution": types,
+        "total_claims": len_claims
+    }
+
+
 # -----------------------------
 # Run pipeline
 # -----------------------------
-with open("claims_extractor/claims.json", "r", encoding="utf-8") as f:
-    claims = json.load(f)
+def main(input_path="claims_extractor/claims.json", output_path="claim_scorer/claims_with_scores.json"):
+    with open(input_path, "r", encoding="utf-8") as f:
+        claims = json.load(f)
 
-claims = process_claims(claims)
+    claims = process_claims(claims)
 
-with open("claim_scorer/claims_with_scores.json", "w", encoding="utf-8") as f:
-    json.dump(claims, f, indent=2, ensure_ascii=False)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(claims, f, indent=2, ensure_ascii=False)
 
-print("✅ Assertiveness + claim type appended and saved")
+    print("✅ Assertiveness + claim type appended and saved")
 
-len_claims, types, avg_score = compute_assertiveness_scores(claims)
-print("\n📊 Claim Type Distribution:")
-for t, count in types.items():
-    print(f"{t.capitalize():<15}: {count}/{len_claims} ({round(count/len_claims*100, 2)}%)")
+    result = summarize_assertiveness(claims)
+    len_claims = result["total_claims"]
+    avg_score = result["average_assertiveness_score"]
 
-# Assertiveness score in % for easier interpretation
-print(f"\nAverage Assertiveness Score: {avg_score} ({avg_score*100:.1f}%)")
+    print("\n📊 Claim Type Distribution:")
+    for t, count in result["claim_type_distribution"].items():
+        print(f"{t.capitalize():<15}: {count}/{len_claims} ({round(count/len_claims*100, 2)}%)")
 
-# -----------------------------
-# Storing it in a variable
-# -----------------------------
-CLAIM_ASSERTIVENESS_RESULT = {
-    "average_assertiveness_score": avg_score,
-    "claim_type_distribution": types,
-    "total_claims": len_claims
-}
\ No newline at end of file
+    # Assertiveness score in % for easier interpretation
+    print(f"\nAverage Assertiveness Score: {avg_score} ({avg_score*100:.1f}%)")
+
+    return result
+
+
+if __name__ == "__main__":
+    # python claim_scorer/assertiveness.py [claims.json] [output.json]
+    CLAIM_ASSERTIVENESS_RESULT = main(*sys.argv[1:3])
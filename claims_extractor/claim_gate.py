@@ -0,0 +1,242 @@
+"""
+Rule-based pre-filter in front of the claim classifier.
+
+Much of what split_into_sentences returns is not prose: table rows, page
+headers and footers, GRI index lines, navigation strings. ClaimGate rejects
+such segments with cheap rules, so DistilBERT only sees plausible sentences.
+Every rule has a name, so its effect can be measured:
+
+  repeated_header a short segment with a number (HEADER_MAX_WORDS words or fewer)
+                  already seen REPEAT_MIN - 1 times in this document, ignoring
+                  the numbers (running headers and footers with page numbers)
+  too_short       fewer than MIN_WORDS words with letters
+  too_long        more than MAX_WORDS words (merged table or layout text; the
+                  model only reads the first MAX_LEN tokens anyway)
+  digits          digits make up more than MAX_DIGIT_RATIO of the alphanumerics
+  index_line      a short segment starting with a reporting-standard code
+                  (GRI 302-1, SASB, ESRS E1...)
+  no_verb         no lowercase verb-like word (auxiliaries, common report verbs,
+                  -ed/-ing forms) and fewer than MIN_FUNCTION_WORDS function words
+                  (the verb list is not exhaustive; prose is full of "the", "of", "we")
+  title_case      like no_verb, and mostly Capitalised Words (headings, navigation)
+
+The splitter cuts after . ! ?, so table rows and headers usually arrive glued
+to the sentence that follows them; such segments have a verb and are kept.
+
+CLAIM_GATE=on (default) skips rejected segments, off sends everything to the
+model, and audit runs both paths: the claims are the same as with off, and
+the number of true claims the gate would have dropped is logged to
+GATE_AUDIT_LOG. For an audit over a set of reports:
+    python claims_extractor/claim_gate.py report1.pdf report2.pdf
+"""
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+CLAIM_GATE = os.getenv("CLAIM_GATE", "on")
+GATE_AUDIT_LOG = os.getenv("GATE_AUDIT_LOG", ".cache/gate_audit.jsonl")
+
+MIN_WORDS = 4
+MAX_WORDS = 150
+MAX_DIGIT_RATIO = 0.5
+MAX_TITLE_RATIO = 0.6
+HEADER_MAX_WORDS = 12
+REPEAT_MIN = 3
+MIN_FUNCTION_WORDS = 2
+
+WORD = re.compile(r"[^\W\d_][\w'’-]*")
+DIGIT = re.compile(r"\d")
+ALNUM = re.compile(r"[^\W_]")
+INDEX_LINE = re.compile(r"^(?:GRI|SASB|TCFD|ESRS|SDG|UNGC|IR)\b[\s:-]*[A-Z]{0,3}[\s-]*\d", re.IGNORECASE)
+NUMBERS = re.compile(r"\d+")
+
+FUNCTION_WORDS = {
+    "the", "a", "an", "of", "to", "in", "on", "for", "with", "by", "from", "at",
+    "as", "and", "or", "but", "that", "which", "this", "these", "those", "its",
+    "we", "our", "us", "they", "their", "it", "than", "into", "across", "per",
+}
+
+# Auxiliaries, modals and verbs that carry most report claims. Inflected
+# forms are matched through the -s/-es/-ed/-ing checks in _has_verb.
+VERBS = {
+    "is", "are", "was", "were", "be", "been", "being", "am", "has", "have", "had",
+    "do", "does", "did", "will", "would", "shall", "should", "can", "could", "may",
+    "might", "must", "won't", "can't", "aim", "plan", "commit", "target", "aspire",
+    "intend", "expect", "seek", "strive", "pledge", "promise", "reduce", "cut",
+    "achieve", "reach", "deliver", "source", "use", "run", "ensure", "support",
+    "continue", "invest", "remain", "become", "make", "set", "take", "help",
+    "work", "launch", "increase", "decrease", "improve", "lower", "avoid",
+    "eliminate", "offset", "recycle", "restore", "protect", "phase", "transition",
+    "align", "meet", "exceed", "maintain", "purchase", "buy", "generate",
+    "consume", "emit", "save", "divert", "reuse", "adopt", "introduce", "develop",
+    "build", "install", "operate", "partner", "engage", "report", "disclose",
+    "measure", "monitor", "track", "verify", "certify", "guarantee", "believe",
+    "remove", "grow", "fall", "rise", "go", "get", "give", "keep", "lead", "see",
+    "put", "hold", "bring", "provide", "include", "require", "contribute",
+    "review", "power", "cover", "follow", "describe", "show", "need", "create",
+    "serve", "drive", "enable", "allow", "offer", "produce", "sell", "manage",
+    "own", "represent", "mean", "apply", "comply", "account", "replace", "switch",
+    "made", "led", "grew", "fell", "rose", "went", "got",
+    "gave", "kept", "held", "brought", "built", "met", "bought", "became", "took",
+}
+
+
+def _has_verb(words):
+    # Words like Report, Source or Target are nouns in headings, so apart from
+    # the first word only lowercase words count
+    for i, w in enumerate(words):
+        if i and not w.islower():
+            continue
+        w = w.lower().strip("'’-")
+        if w in VERBS:
+            return True
+        if len(w) > 4 and (w.endswith("ed") or w.endswith("ing")):
+            return True
+        if len(w) > 3 and w.endswith("s") and (w[:-1] in VERBS or w.endswith("es") and w[:-2] in VERBS):
+            return True
+    return False
+
+
+def header_key(segment: str) -> str:
+    # Page numbers and years change between pages; the rest of a header does not
+    return NUMBERS.sub("#", re.sub(r"\s+", " ", segment).strip().lower())
+
+
+class ClaimGate:
+    """
+    Rejects obvious non-claims. One gate per document (repeated-header
+    detection counts what this document has shown so far).
+    """
+
+    def __init__(self):
+        self.seen = Counter()
+        self.checked = 0
+        self.rejected = Counter()
+
+    def reason(self, segment: str):
+        """
+        Name of the first rule that rejects the segment, or None.
+        """
+        words = WORD.findall(segment)
+        short = len(words) <= HEADER_MAX_WORDS
+
+        if short and DIGIT.search(segment):
+            key = header_key(segment)
+            self.seen[key] += 1
+            if self.seen[key] >= REPEAT_MIN:
+                return "repeated_header"
+
+        if len(words) < MIN_WORDS:
+            return "too_short"
+        if len(words) > MAX_WORDS:
+            return "too_long"
+
+        alnum = len(ALNUM.findall(segment))
+        if alnum and len(DIGIT.findall(segment)) / alnum > MAX_DIGIT_RATIO:
+            return "digits"
+
+        if short and INDEX_LINE.match(segment):
+            return "index_line"
+
+        function_words = sum(1 for w in words if w in FUNCTION_WORDS)
+        if not _has_verb(words) and function_words < MIN_FUNCTION_WORDS:
+            if sum(w[0].isupper() for w in words) / len(words) > MAX_TITLE_RATIO:
+                return "title_case"
+            return "no_verb"
+
+        return None
+
+    def filter(self, sentences):
+        """
+        Returns (indices of the sentences to classify, {index: rule} for the rest).
+        """
+        kept, rejected = [], {}
+        for i, s in enumerate(sentences):
+            rule = self.reason(s)
+            if rule is None:
+                kept.append(i)
+            else:
+                rejected[i] = rule
+                self.rejected[rule] += 1
+        self.checked += len(sentences)
+        return kept, rejected
+
+    def stats(self) -> dict:
+        rejected = sum(self.rejected.values())
+        return {
+            "checked": self.checked,
+            "rejected": rejected,
+            "rejected_share": round(rejected / self.checked, 4) if self.checked else 0.0,
+            "by_rule": dict(self.rejected.most_common())
+        }
+
+# -----------------------------
+# Recall audit
+# -----------------------------
+class GateAudit:
+    """
+    Counts the claims (model probability >= threshold) among rejected segments.
+    """
+
+    def __init__(self, examples=5):
+        self.claims = 0
+        self.dropped = Counter()
+        self.examples = {}
+        self.max_examples = examples
+
+    def add(self, sentences, probs, rejected, threshold):
+        for i, p in enumerate(probs):
+            if p < threshold:
+                continue
+            self.claims += 1
+            rule = rejected.get(i)
+            if rule is not None:
+                self.dropped[rule] += 1
+                examples = self.examples.setdefault(rule, [])
+                if len(examples) < self.max_examples:
+                    examples.append(sentences[i])
+
+    def report(self, gate) -> dict:
+        dropped = sum(self.dropped.values())
+        return {
+            **gate.stats(),
+            "claims": self.claims,
+            "dropped_claims": dropped,
+            "recall": round(1 - dropped / self.claims, 4) if self.claims else 1.0,
+            "dropped_by_rule": dict(self.dropped.most_common()),
+            "examples": self.examples
+        }
+
+
+def log_audit(report, source=None, path=GATE_AUDIT_LOG):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"time": time.time(), "source": source, **report}, ensure_ascii=False) + "\n")
+
+
+def main():
+    # python claims_extractor/claim_gate.py report.pdf [...]
+    from run_pdf_claims_extractor import audit_gate
+
+    if len(sys.argv) < 2:
+        print("Please provide PDF paths.")
+        sys.exit(1)
+
+    for pdf_path in sys.argv[1:]:
+        report = audit_gate(pdf_path)
+        print(f"📄 {pdf_path}")
+        print(f"  Gate rejected {report['rejected']} of {report['checked']} segments "
+              f"({report['rejected_share'] * 100:.1f}% fewer model inputs): {report['by_rule']}")
+        print(f"  Claims dropped: {report['dropped_claims']} of {report['claims']} "
+              f"(recall {report['recall'] * 100:.2f}%) {report['dropped_by_rule']}")
+        for rule, examples in report["examples"].items():
+            for s in examples:
+                print(f"    ⚠️ [{rule}] {s[:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+CACHE_DB = os.getenv("CLAIM_CACHE_DB", ".cache/claim_probs.sqlite3")
+LOOKUP_CHUNK = 500   # stays below SQLite's bound-parameter limit
+
+def normalize_sentence(sentence: str) -> str:
+    # The classifier is uncased and ignores whitespace, so neither changes its output
+    return re.sub(r"\s+", " ", sentence).strip().lower()
+
+def sentence_hash(sentence: str) -> str:
+    return hashlib.sha256(normalize_sentence(sentence).encode("utf-8")).hexdigest()
+
+_model_versions = {}
+
+def model_version(model_path: str) -> str:
+    """
+    Fingerprint of the saved classifier: config.json contents plus the name,
+    size and mtime of every file. Computed once per path and process.
+    """
+    root = Path(model_path).resolve()
+    if root not in _model_versions:
+        digest = hashlib.sha256()
+        config = root / "config.json"
+        if config.is_file():
+            digest.update(config.read_bytes())
+        for p in sorted(root.rglob("*")):
+            if p.is_file():
+                stat = p.stat()
+                digest.update(f"{p.relative_to(root)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        _model_versions[root] = digest.hexdigest()[:16]
+    return _model_versions[root]
+
+
+class ClaimProbCache:
+    """
+    SQLite table of claim probabilities keyed by (normalised sentence hash, model version).
+    Boilerplate sentences repeat across years and companies, so most of a
+    new report can be answered without running DistilBERT.
+    """
+
+    def __init__(self, model_version: str, db_path=CACHE_DB):
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS claim_probs (
+                sentence_hash TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                prob REAL NOT NULL,
+                PRIMARY KEY (sentence_hash, model_version)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def lookup(self, sentences):
+        """
+        Returns a list aligned with sentences: the cached probability, or None.
+        """
+        hashes = [sentence_hash(s) for s in sentences]
+        found = {}
+
+        with self._lock:
+            unique = list(set(hashes))
+            for start in range(0, len(unique), LOOKUP_CHUNK):
+                chunk = unique[start:start + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT sentence_hash, prob FROM claim_probs "
+                    f"WHERE model_version = ? AND sentence_hash IN ({placeholders})",
+                    [self.model_version, *chunk]
+                )
+                found.update(rows)
+
+        probs = [found.get(h) for h in hashes]
+        hits = sum(1 for p in probs if p is not None)
+        self.hits += hits
+        self.misses += len(probs) - hits
+        return probs
+
+    def store(self, sentences, probs):
+        rows = [(sentence_hash(s), self.model_version, float(p)) for s, p in zip(sentences, probs)]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO claim_probs (sentence_hash, model_version, prob) VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
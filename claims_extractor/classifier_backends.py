@@ -0,0 +1,265 @@
+"""
+Optimised CPU backends for the claim classifier.
+
+CLAIM_BACKEND selects how extract_claims runs DistilBERT:
+  torch       the saved fp32 PyTorch model (default)
+  int8        PyTorch with the Linear layers dynamically quantised to int8
+  onnx        ONNX Runtime, fp32
+  onnx-int8   ONNX Runtime with int8 weights (dynamic quantisation)
+
+The ONNX files are written to <ONNX_DIR>/<model version>/ the first time they
+are needed, or ahead of time with:
+    python claims_extractor/classifier_backends.py export
+
+Before switching a server to a new backend, compare it with fp32 on the
+held-out rows of the training CSV (the test split of model/model.py):
+    python claims_extractor/classifier_backends.py parity --backend onnx-int8 --sentences claims.csv
+"""
+import argparse
+import csv
+import importlib.util
+import inspect
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from claim_prob_cache import model_version
+
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+ONNX_DIR = os.getenv("CLAIM_ONNX_DIR", ".cache/onnx")
+ONNX_OPSET = 17
+PARITY_MIN_AGREEMENT = 0.99   # share of sentences whose claim decision must not change
+
+# -----------------------------
+# PyTorch int8
+# -----------------------------
+def quantize_torch(model):
+    """
+    Dynamic int8 quantisation: Linear weights are stored as int8 and
+    activations are quantised on the fly, so no calibration data is needed.
+    """
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+# -----------------------------
+# ONNX export
+# -----------------------------
+def onnx_dir(model_path) -> Path:
+    return Path(ONNX_DIR) / model_version(model_path)
+
+
+def export_onnx(model_path) -> Path:
+    """
+    Exports the fp32 model with dynamic batch and sequence axes, plus an
+    int8 copy. Returns the directory holding model.onnx and model-int8.onnx.
+    """
+    import torch
+    from transformers import DistilBertForSequenceClassification, DistilBertTokenizerFast
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    out = onnx_dir(model_path)
+    out.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = DistilBertTokenizerFast.from_pretrained(model_path)
+    model = DistilBertForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+
+    sample = tokenizer(["We reduced emissions by 20%.", "Net zero by 2040."], padding=True, return_tensors="pt")
+
+    # Newer torch versions default to the dynamo exporter, which needs onnxscript
+    options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    tmp = out / f"model.{os.getpid()}.tmp.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(tmp),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"}
+            },
+            opset_version=ONNX_OPSET,
+            **options
+        )
+    os.replace(tmp, out / "model.onnx")
+
+    tmp = out / f"model-int8.{os.getpid()}.tmp.onnx"
+    quantize_dynamic(str(out / "model.onnx"), str(tmp), weight_type=QuantType.QInt8)
+    os.replace(tmp, out / "model-int8.onnx")
+
+    return out
+
+
+class OnnxClassifier:
+    """
+    ONNX Runtime session with the call signature of the PyTorch model:
+    model(input_ids=..., attention_mask=...).logits is a torch tensor.
+    """
+
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids, attention_mask, **_):
+        import torch
+
+        logits = self.session.run(["logits"], {
+            "input_ids": input_ids.cpu().numpy(),
+            "attention_mask": attention_mask.cpu().numpy()
+        })[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def load_onnx(model_path, int8=False):
+    path = onnx_dir(model_path) / ("model-int8.onnx" if int8 else "model.onnx")
+    if not path.exists():
+        export_onnx(model_path)
+
+    import torch
+    return OnnxClassifier(path, threads=torch.get_num_threads())
+
+# -----------------------------
+# Parity check against fp32
+# -----------------------------
+def _training_split():
+    # model/model.py is a script, not a package module
+    spec = importlib.util.spec_from_file_location(
+        "claim_model_training", Path(__file__).resolve().parent.parent / "model" / "model.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.is_test
+
+
+def read_sentences(path, held_out=True):
+    """
+    Sentences (and labels, if any) from a CSV with a "sentence" column
+    (and optionally "label"), a text file with one sentence per line, or a PDF.
+    With held_out, a CSV is taken to be the training corpus and only its
+    test-split rows (the ones model/model.py does not train on) are returned.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [r for r in csv.DictReader(f) if r.get("sentence", "").strip()]
+        if held_out:
+            is_test = _training_split()
+            rows = [r for r in rows if is_test(r["sentence"].strip())]
+        labels = [int(r["label"]) for r in rows] if rows and "label" in rows[0] else None
+        return [r["sentence"] for r in rows], labels
+
+    if path.suffix.lower() == ".pdf":
+        from run_pdf_claims_extractor import read_report_text
+        from sentence_splitter import split_into_sentences
+        return split_into_sentences(read_report_text(str(path))), None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()], None
+
+
+def _timed_predict(sentences, classifier):
+    from extract_claims import _predict
+
+    start = time.perf_counter()
+    probs = _predict(sentences, classifier=classifier)
+    return probs, time.perf_counter() - start
+
+
+def check_parity(sentences, backend, labels=None, threshold=None):
+    """
+    Runs the fp32 model and backend on the same sentences (without the
+    probability cache) and compares probabilities and claim decisions.
+    """
+    import numpy as np
+    from extract_claims import load_classifier
+    from run_pdf_claims_extractor import CLAIM_THRESHOLD
+
+    threshold = CLAIM_THRESHOLD if threshold is None else threshold
+
+    reference, reference_s = _timed_predict(sentences, load_classifier("torch"))
+    candidate, candidate_s = _timed_predict(sentences, load_classifier(backend))
+
+    reference = np.array(reference)
+    candidate = np.array(candidate)
+    drift = np.abs(candidate - reference)
+    ref_claims = reference >= threshold
+    new_claims = candidate >= threshold
+
+    report = {
+        "backend": backend,
+        "sentences": len(sentences),
+        "threshold": threshold,
+        "mean_abs_drift": round(float(drift.mean()), 6),
+        "p99_abs_drift": round(float(np.percentile(drift, 99)), 6),
+        "max_abs_drift": round(float(drift.max()), 6),
+        "agreement": round(float((ref_claims == new_claims).mean()), 6),
+        "lost_claims": int((ref_claims & ~new_claims).sum()),
+        "new_claims": int((~ref_claims & new_claims).sum()),
+        "fp32_sentences_per_s": round(len(sentences) / reference_s, 1),
+        "backend_sentences_per_s": round(len(sentences) / candidate_s, 1),
+        "speedup": round(reference_s / candidate_s, 2)
+    }
+
+    if labels is not None:
+        labels = np.array(labels, dtype=bool)
+        report["fp32_accuracy"] = round(float((ref_claims == labels).mean()), 4)
+        report["backend_accuracy"] = round(float((new_claims == labels).mean()), 4)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and check the optimised claim classifier backends.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("export", help="write the ONNX (fp32 and int8) files for MODEL_PATH")
+
+    parity = sub.add_parser("parity", help="compare a backend with the fp32 model")
+    parity.add_argument("--backend", choices=BACKENDS[1:], default="onnx-int8")
+    parity.add_argument("--sentences", default="claims.csv", help=".csv (sentence[,label]), .txt or .pdf")
+    parity.add_argument("--all-rows", action="store_true",
+                        help="use every CSV row, not only the held-out test split (for a CSV the model never saw)")
+    parity.add_argument("--threshold", type=float, help="claim threshold (default CLAIM_THRESHOLD)")
+    parity.add_argument("--min-agreement", type=float, default=PARITY_MIN_AGREEMENT)
+    args = parser.parse_args()
+
+    from extract_claims import MODEL_PATH
+
+    if args.command == "export":
+        print(f"✅ ONNX models saved to {export_onnx(MODEL_PATH)}")
+        return
+
+    sentences, labels = read_sentences(args.sentences, held_out=not args.all_rows)
+    if not sentences:
+        print(f"⚠️ No sentences to compare in {args.sentences}")
+        sys.exit(1)
+    report = check_parity(sentences, args.backend, labels, args.threshold)
+
+    print(f"📊 {report['backend']} vs fp32 on {report['sentences']} sentences")
+    print(f"  Probability drift: mean {report['mean_abs_drift']:.5f}, "
+          f"p99 {report['p99_abs_drift']:.5f}, max {report['max_abs_drift']:.5f}")
+    print(f"  Claim decisions: {report['agreement'] * 100:.2f}% agree "
+          f"({report['lost_claims']} claims lost, {report['new_claims']} new)")
+    print(f"  Throughput: {report['fp32_sentences_per_s']:,.1f} -> "
+          f"{report['backend_sentences_per_s']:,.1f} sentences/s ({report['speedup']}x)")
+    if labels is not None:
+        print(f"  Accuracy: {report['fp32_accuracy']} -> {report['backend_accuracy']}")
+
+    if report["agreement"] < args.min_agreement:
+        print(f"⚠️ Agreement is below {args.min_agreement * 100:.1f}%")
+        sys.exit(1)
+    print("✅ Backend matches fp32 closely enough")
+
+
+if __name__ == "__main__":
+    main()
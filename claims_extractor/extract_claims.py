@@ -1,28 +1,151 @@
-import torch
-from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+import os
+
+try:
+    from tracing import span
+except ImportError:   # run as a standalone script: no tracing
+    from contextlib import nullcontext
+
+    def span(name, items=None, **attrs):
+        return nullcontext()
 
 MODEL_PATH = "./claim_classifier"
 MAX_LEN = 128
+BATCH_SIZE = 32
+# "torch" (fp32), "int8", "onnx" or "onnx-int8" (see classifier_backends.py)
+CLAIM_BACKEND = os.getenv("CLAIM_BACKEND", "torch")
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+_classifier = None
+_prob_cache = None
 
-tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_PATH)
-model = DistilBertForSequenceClassification.from_pretrained(MODEL_PATH)
-model.to(device)
-model.eval()
+def load_classifier(backend=None):
+    """
+    Returns (tokenizer, model, device) for the given backend (default CLAIM_BACKEND).
+    Every backend's model is called the same way: model(**inputs).logits.
+    """
+    import torch
+    from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
 
-def is_claim(sentence: str, threshold=0.6):
-    inputs = tokenizer(
-        sentence,
-        truncation=True,
-        padding=True,
-        max_length=MAX_LEN,
-        return_tensors="pt"
-    ).to(device)
+    backend = backend or CLAIM_BACKEND
+
+    with span("classifier.load", backend=backend):
+        tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_PATH)
+
+        if backend in ("onnx", "onnx-int8"):
+            from classifier_backends import load_onnx
+            return tokenizer, load_onnx(MODEL_PATH, int8=backend == "onnx-int8"), torch.device("cpu")
+
+        if backend not in ("torch", "int8"):
+            raise ValueError(f"Unknown CLAIM_BACKEND {backend!r}")
+
+        device = torch.device("cuda" if torch.cuda.is_available() and backend == "torch" else "cpu")
+        model = DistilBertForSequenceClassification.from_pretrained(MODEL_PATH)
+        model.eval()
+        if backend == "int8":
+            from classifier_backends import quantize_torch
+            model = quantize_torch(model)
+        model.to(device)
+
+    return tokenizer, model, device
+
+def get_classifier():
+    """
+    Loads the tokenizer and model on first use and returns (tokenizer, model, device).
+    torch and transformers are only imported here, so importing this module is cheap.
+    """
+    global _classifier
+    if _classifier is None:
+        _classifier = load_classifier()
+    return _classifier
+
+def backend_version():
+    """
+    Identifies the weights and the backend: quantised backends give slightly
+    different probabilities, so they get their own cache entries.
+    """
+    from claim_prob_cache import model_version
+    version = model_version(MODEL_PATH)
+    return version if CLAIM_BACKEND == "torch" else f"{version}-{CLAIM_BACKEND}"
+
+def get_prob_cache():
+    """
+    Opens the sentence-level probability cache for the current model on first use.
+    """
+    global _prob_cache
+    if _prob_cache is None:
+        from claim_prob_cache import ClaimProbCache
+        _prob_cache = ClaimProbCache(backend_version())
+    return _prob_cache
+
+def classify_sentences(sentences, batch_size=BATCH_SIZE, use_cache=True):
+    """
+    Returns the claim probability for every sentence, in input order.
+    Probabilities already in the sentence cache are reused; only the
+    remaining sentences go through the model and are then added to the cache.
+    """
+    sentences = list(sentences)
+    if not sentences:
+        return []
+
+    if not use_cache:
+        return _predict(sentences, batch_size)
+
+    cache = get_prob_cache()
+    with span("classifier.cache_lookup", items=len(sentences)):
+        probs = cache.lookup(sentences)
+
+    # Run each distinct uncached sentence once
+    missing = {}
+    for i, p in enumerate(probs):
+        if p is None:
+            missing.setdefault(sentences[i], []).append(i)
+
+    if missing:
+        todo = list(missing)
+        new_probs = _predict(todo, batch_size)
+        cache.store(todo, new_probs)
+
+        for s, p in zip(todo, new_probs):
+            for i in missing[s]:
+                probs[i] = p
+
+    return probs
+
+def _predict(sentences, batch_size=BATCH_SIZE, classifier=None):
+    """
+    Runs the model. Sentences are sorted by token length and padded per batch,
+    so short sentences are not padded up to the longest one in the report.
+    """
+    import torch
+    tokenizer, model, device = classifier or get_classifier()
+
+    with span("classifier.tokenize", items=len(sentences)):
+        encodings = tokenizer(
+            sentences,
+            truncation=True,
+            max_length=MAX_LEN
+        )["input_ids"]
+
+    order = sorted(range(len(sentences)), key=lambda i: len(encodings[i]))
+    probs = [0.0] * len(sentences)
 
     with torch.no_grad():
-        outputs = model(**inputs)
-        probs = torch.softmax(outputs.logits, dim=1)
-        claim_prob = probs[0][1].item()
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            with span("classifier.batch", items=len(batch_idx)):
+                inputs = tokenizer.pad(
+                    {"input_ids": [encodings[i] for i in batch_idx]},
+                    padding="longest",
+                    return_tensors="pt"
+                ).to(device)
+
+                outputs = model(**inputs)
+                claim_probs = torch.softmax(outputs.logits, dim=1)[:, 1].tolist()
 
+            for i, p in zip(batch_idx, claim_probs):
+                probs[i] = p
+
+    return probs
+
+def is_claim(sentence: str, threshold=0.6):
+    claim_prob = classify_sentences([sentence])[0]
     return claim_prob >= threshold, claim_prob
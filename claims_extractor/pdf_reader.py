@@ -1,15 +1,82 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import PyPDF2
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+try:
+    from tracing import span
+except ImportError:   # run as a standalone script: no tracing
+    from contextlib import nullcontext
+
+    def span(name, items=None, **attrs):
+        return nullcontext()
+
+# Worker processes for text extraction. Serial by default: the web server and
+# batch workers already keep the CPUs busy (classifier threads, one process per
+# report), so a pool per upload only oversubscribes them. Opt in for one-off runs.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "1"))
+PAGES_PER_SHARD = 16
+PARALLEL_MIN_PAGES = 48   # smaller documents are read serially
+
+def _extract_page_range(pdf_path: str, start: int, stop: int):
+    # Runs in a worker process: each worker opens the file on its own
+    with open(pdf_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+def _iter_pages_parallel(pdf_path: str, page_count: int, workers: int):
+    shards = [
+        (start, min(start + PAGES_PER_SHARD, page_count))
+        for start in range(0, page_count, PAGES_PER_SHARD)
+    ]
+
+    # spawn, not fork: the caller may be a thread of a process with live torch threads
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        pending = deque()
+        next_shard = 0
+
+        # Keep a few shards in flight per worker; results come back in page order
+        while next_shard < len(shards) or pending:
+            while next_shard < len(shards) and len(pending) < workers * 2:
+                start, stop = shards[next_shard]
+                pending.append((pool.submit(_extract_page_range, pdf_path, start, stop), stop - start))
+                next_shard += 1
+
+            future, pages = pending.popleft()
+            # Time spent waiting for the shard; the reading itself happens in the worker
+            with span("pdf.read_shard", items=pages):
+                shard = future.result()
+            yield from shard
+    finally:
+        # Also runs when the consumer stops early: queued shards are dropped
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def iter_pdf_pages(pdf_path: str, workers: int = None):
+    """
+    Yields the text of each page, one page at a time, in page order.
+    Large documents are split into page ranges and read by a process pool.
+    """
     pdf_path = Path(pdf_path)
-    text = []
+    workers = PDF_WORKERS if workers is None else workers
 
     with pdf_path.open("rb") as f:
         reader = PyPDF2.PdfReader(f)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text.append(page_text)
+        page_count = len(reader.pages)
+
+        if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+            for page in reader.pages:
+                with span("pdf.read_page", items=1):
+                    page_text = page.extract_text()
+                if page_text:
+                    yield page_text
+            return
+
+    for page_text in _iter_pages_parallel(str(pdf_path), page_count, workers):
+        if page_text:
+            yield page_text
 
-    return "\n".join(text)
+def extract_text_from_pdf(pdf_path: str, workers: int = None) -> str:
+    return "\n".join(iter_pdf_pages(pdf_path, workers))
@@ -1,18 +1,10 @@
-import textstat
 import re
 
-def calculate_difficulty_score(text: str) -> dict:
-    text = text.replace("\n", " ")
-
-    total_words = textstat.lexicon_count(text, removepunct=True)
-    total_sentences = textstat.sentence_count(text)
+def _difficulty_result(flesch, total_words, total_sentences, difficult_words):
     avg_sentence_length = (
         total_words / max(total_sentences, 1)
     )
 
-    flesch = textstat.flesch_reading_ease(text)
-    difficult_words = textstat.difficult_words(text)
-
     readability_score = 1 - min(1, flesch / 100)
     sentence_score = min(1, avg_sentence_length / 30)
     difficult_ratio = difficult_words / max(total_words, 1)
@@ -30,3 +22,16 @@ def calculate_difficulty_score(text: str) -> dict:
         "difficult_words": difficult_words,
         "difficulty_to_read_score": final_score
     }
+
+def calculate_difficulty_score(text: str) -> dict:
+    # textstat pulls in nltk/scipy, so import it only when scoring
+    import textstat
+
+    text = text.replace("\n", " ")
+
+    total_words = textstat.lexicon_count(text, removepunct=True)
+    total_sentences = textstat.sentence_count(text)
+    flesch = textstat.flesch_reading_ease(text)
+    difficult_words = textstat.difficult_words(text)
+
+    return _difficulty_result(flesch, total_words, total_sentences, difficult_words)
@@ -1,32 +1,251 @@
-from pdf_reader import extract_text_from_pdf
-from sentence_splitter import split_into_sentences
-from extract_claims import is_claim
-from vague_words import calculate_vague_words_score
+from pdf_reader import iter_pdf_pages
+from sentence_splitter import split_into_sentences, iter_segment_spans, MIN_SENTENCE_LENGTH
+from extract_claims import classify_sentences, get_prob_cache
+from vague_words import calculate_vague_words_score, find_vague_terms
 from readablity import calculate_difficulty_score
+from text_metrics import TextStats, scan_text
+from text_normalizer import TEXT_NORMALIZE, PageNormalizer
+import claim_gate
+import collections
+import contextvars
 import json
 import os
+import queue
 import sys
+import threading
 
+try:
+    from tracing import span
+except ImportError:   # run as a standalone script: no tracing
+    from contextlib import nullcontext
+
+    def span(name, items=None, **attrs):
+        return nullcontext()
+
+CLAIM_THRESHOLD = 0.6
+STREAM_CHUNK = 256      # sentences handed to the classifier at a time
+STREAM_QUEUE_SIZE = 4   # parsed chunks waiting for the classifier
+STREAM_PUT_TIMEOUT = 0.1   # seconds between checks for a stopped consumer
+
+
+def _make_gate(mode=None):
+    """
+    (gate, audit) for one document, following CLAIM_GATE unless mode is given.
+    """
+    mode = mode or claim_gate.CLAIM_GATE
+    if mode == "off":
+        return None, None
+    return claim_gate.ClaimGate(), claim_gate.GateAudit() if mode == "audit" else None
 
-def extract_claims_from_pdf(pdf_path):
-    text = extract_text_from_pdf(pdf_path)
-    vague_list = calculate_vague_words_score(text)
-    difficulty = calculate_difficulty_score(text)
-    sentences = split_into_sentences(text)
 
+def _keep_claims(sentences, gate=None, audit=None, vague_terms=None):
+    """
+    Claims among sentences. vague_terms, aligned with sentences, gives the
+    vague terms already found in each one; without it claims are scanned here.
+    """
     claims = []
 
-    for s in sentences:
-        keep, score = is_claim(s)
-        if keep:
+    if gate is None:
+        probs = classify_sentences(sentences)
+    else:
+        with span("gate.filter", items=len(sentences)):
+            kept, rejected = gate.filter(sentences)
+
+        if audit is not None:
+            # Both paths: the model sees everything, the audit counts what the gate would have lost
+            probs = classify_sentences(sentences)
+            audit.add(sentences, probs, rejected, CLAIM_THRESHOLD)
+        else:
+            probs = [0.0] * len(sentences)
+            kept_probs = classify_sentences([sentences[i] for i in kept])
+            for i, p in zip(kept, kept_probs):
+                probs[i] = p
+
+    for i, (s, score) in enumerate(zip(sentences, probs)):
+        if score >= CLAIM_THRESHOLD:
             claims.append({
                 "sentence": s,
-                "confidence": round(score, 3)
+                "confidence": round(score, 3),
+                "vague_terms": vague_terms[i] if vague_terms is not None else [term for _, _, term in find_vague_terms(s)]
             })
 
+    return claims
+
+
+def _finish_audit(gate, audit, source):
+    if audit is None:
+        return
+    report = audit.report(gate)
+    claim_gate.log_audit(report, source)
+    print(f"Gate audit: {report['rejected']} of {report['checked']} segments rejected, "
+          f"{report['dropped_claims']} of {report['claims']} claims would be dropped "
+          f"(recall {report['recall'] * 100:.2f}%)")
+
+
+def read_report_text(pdf_path):
+    """
+    The report's text, with headers, footers and layout line breaks cleaned
+    up unless TEXT_NORMALIZE=0.
+    """
+    pages = iter_pdf_pages(pdf_path)
+    if TEXT_NORMALIZE:
+        pages = PageNormalizer().iter_pages(pages)
+    return "\n".join(pages)
+
+
+def audit_gate(pdf_path):
+    """
+    Recall audit for one report: which rules reject segments, and how many
+    of the model's claims are among them.
+    """
+    sentences = split_into_sentences(read_report_text(pdf_path))
+    gate, audit = claim_gate.ClaimGate(), claim_gate.GateAudit()
+    _keep_claims(sentences, gate, audit)
+    return audit.report(gate)
+
+
+def extract_claims_from_text(pdf_path):
+    text = read_report_text(pdf_path)
+    with span("metrics.vague_words", items=len(text), unit="chars"):
+        vague_list = calculate_vague_words_score(text)
+    with span("metrics.readability", items=len(text), unit="chars"):
+        difficulty = calculate_difficulty_score(text)
+    sentences = split_into_sentences(text)
+
+    gate, audit = _make_gate()
+    claims = _keep_claims(sentences, gate, audit)
+    _finish_audit(gate, audit, str(pdf_path))
+
     return claims, vague_list, difficulty
 
 
+def extract_claims_streaming(pdf_path, chunk_size=STREAM_CHUNK):
+    """
+    Page-by-page version of extract_claims_from_text with bounded memory.
+    Returns the same claims, vague score and difficulty score.
+    """
+    return extract_claims_from_pages(iter_pdf_pages(pdf_path), chunk_size, source=str(pdf_path))
+
+
+def _with_stats(pages, stats, vague_matches):
+    # Merges each page's TextStats into stats[0] as the page goes by, and appends
+    # its vague-term matches to vague_matches with offsets in the joined pages
+    offset = 0
+    for page in pages:
+        with span("metrics.scan_page", items=len(page), unit="chars"):
+            matches = find_vague_terms(page)
+            stats[0] = stats[0] + scan_text(page, matches)
+        vague_matches.extend((offset + start, offset + end, term) for start, end, term in matches)
+        offset += len(page) + 1
+        yield page
+
+
+def extract_claims_from_pages(pages, chunk_size=STREAM_CHUNK, source=None, normalizer=None):
+    """
+    Runs claim extraction over an iterable of page texts.
+    A reader thread consumes the pages, cleans them up (normalizer, a new
+    PageNormalizer by default), splits sentences and merges the per-page
+    language metrics; the classifier works through chunks of sentences meanwhile.
+    source only labels the gate audit log.
+    """
+    gate, audit = _make_gate()
+
+    if normalizer is None and TEXT_NORMALIZE:
+        normalizer = PageNormalizer()
+    if normalizer is not None:
+        pages = normalizer.iter_pages(pages)
+    chunks = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    stop = threading.Event()   # set when the consumer is done, normally or not
+    stats = [TextStats()]
+    vague_matches = collections.deque()   # (start, end, term), consumed in order by the reader
+    errors = []
+
+    def put(item):
+        # Gives up once stop is set, so a failed consumer never leaves the reader blocked
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=STREAM_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read_pages():
+        segments = iter_segment_spans(_with_stats(pages, stats, vague_matches))
+        try:
+            batch, batch_terms = [], []
+            for offset, segment in segments:
+                s = segment.strip()
+                if len(s) <= MIN_SENTENCE_LENGTH:
+                    continue
+
+                # Attributes the page scan's matches to the sentence by span
+                start = offset + len(segment) - len(segment.lstrip())
+                end = start + len(s)
+                while vague_matches and vague_matches[0][0] < start:
+                    vague_matches.popleft()
+                terms = []
+                while vague_matches and vague_matches[0][1] <= end:
+                    terms.append(vague_matches.popleft()[2])
+                batch.append(s)
+                batch_terms.append(terms)
+
+                if len(batch) >= chunk_size:
+                    if not put((batch, batch_terms)):
+                        return
+                    batch, batch_terms = [], []
+
+            if batch:
+                put((batch, batch_terms))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Releases the page source (and the PDF process pool) when stopped early
+            segments.close()
+            if hasattr(pages, "close"):
+                pages.close()
+            put(None)
+
+    # The reader thread records its spans in the caller's trace
+    reader = threading.Thread(target=contextvars.copy_context().run, args=(read_pages,), daemon=True)
+    reader.start()
+
+    claims = []
+    try:
+        while True:
+            batch = chunks.get()
+            if batch is None:
+                break
+            sentences, vague_terms = batch
+            claims.extend(_keep_claims(sentences, gate, audit, vague_terms))
+    finally:
+        stop.set()
+        while True:
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                break
+        reader.join()
+
+    if errors:
+        raise errors[0]
+
+    _finish_audit(gate, audit, source)
+
+    with span("metrics.vague_words"):
+        vague = stats[0].vague_words_score()
+    with span("metrics.readability"):
+        difficulty = stats[0].difficulty_score()
+
+    return claims, vague, difficulty
+
+
+def extract_claims_from_pdf(pdf_path, stream=True):
+    if stream:
+        return extract_claims_streaming(pdf_path)
+    return extract_claims_from_text(pdf_path)
+
+
 if __name__ == "__main__":
 
     if len(sys.argv) < 2:
@@ -34,18 +253,25 @@ if __name__ == "__main__":
         sys.exit(1)
 
     pdf_file = sys.argv[1]
+    stream = "--no-stream" not in sys.argv[2:]
+    # --output-dir DIR writes claims.json and scores.json there instead of claims_extractor/
+    output_dir = sys.argv[sys.argv.index("--output-dir") + 1] if "--output-dir" in sys.argv[2:-1] else "claims_extractor"
 
-    claims, VAGUE_LIST, DIFFICULTY = extract_claims_from_pdf(pdf_file)
+    claims, VAGUE_LIST, DIFFICULTY = extract_claims_from_pdf(pdf_file, stream=stream)
 
     print(f"Extracted {len(claims)} claims from {pdf_file}")
 
+    cache_stats = get_prob_cache().stats()
+    print(f"Claim cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+          f"({cache_stats['hit_rate']*100:.1f}% hit rate)")
+
     # Ensure output folder exists
-    os.makedirs("claims_extractor", exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
 
-    with open("claims_extractor/claims.json", "w", encoding="utf-8") as f:
+    with open(os.path.join(output_dir, "claims.json"), "w", encoding="utf-8") as f:
         json.dump(claims, f, indent=2)
 
-    with open("claims_extractor/scores.json", "w", encoding="utf-8") as f:
+    with open(os.path.join(output_dir, "scores.json"), "w", encoding="utf-8") as f:
         json.dump({
             "vague_words_score": VAGUE_LIST,
             "difficulty_score": DIFFICULTY
@@ -1,5 +1,62 @@
 import re
 
+try:
+    from tracing import span
+except ImportError:   # run as a standalone script: no tracing
+    from contextlib import nullcontext
+
+    def span(name, items=None, **attrs):
+        return nullcontext()
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+MIN_SENTENCE_LENGTH = 20
+
 def split_into_sentences(text: str):
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    return [s.strip() for s in sentences if len(s.strip()) > 20]
+    with span("split.text", items=len(text), unit="chars"):
+        sentences = SENTENCE_BOUNDARY.split(text)
+    return [s.strip() for s in sentences if len(s.strip()) > MIN_SENTENCE_LENGTH]
+
+def iter_text_segments(pages):
+    """
+    Splits pages into sentence segments as they arrive.
+    The last piece of each page may continue on the next page, so it is
+    carried over and joined with a newline, like extract_text_from_pdf does.
+    Segments are not stripped or filtered (language metrics need all of them).
+    """
+    for _, segment in iter_segment_spans(pages):
+        yield segment
+
+def iter_segment_spans(pages):
+    """
+    iter_text_segments with the offset of each segment in the pages joined
+    with newlines, as (offset, segment) pairs.
+    """
+    carry = None
+    carry_start = page_start = 0
+
+    for page in pages:
+        if carry is None:
+            chunk, chunk_start = page, page_start
+        else:
+            chunk, chunk_start = carry + "\n" + page, carry_start
+        page_start += len(page) + 1
+
+        with span("split.page", items=len(chunk), unit="chars"):
+            boundaries = [m.span() for m in SENTENCE_BOUNDARY.finditer(chunk)]
+        pos = 0
+        for start, end in boundaries:
+            yield chunk_start + pos, chunk[pos:start]
+            pos = end
+        carry, carry_start = chunk[pos:], chunk_start + pos
+
+    if carry is not None:
+        yield carry_start, carry
+
+def iter_sentences(pages):
+    """
+    Streaming version of split_into_sentences.
+    """
+    for segment in iter_text_segments(pages):
+        s = segment.strip()
+        if len(s) > MIN_SENTENCE_LENGTH:
+            yield s
@@ -0,0 +1,203 @@
+"""
+Fused language metrics.
+
+scan_text() reads a page once and returns a small TextStats partial with
+everything the vague-words and readability scores need. Partials add up
+exactly (stats_a + stats_b is the partial of the two pages joined with "\n"),
+so pages can be scanned in any order or in parallel and merged afterwards.
+
+The counts follow textstat's definitions:
+  - words: whitespace tokens that keep a character after punctuation removal
+  - sentences: pieces between runs of . ! ? with more than two words
+  - difficult words: distinct (case-preserved) words textstat flags as difficult
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from vague_words import find_vague_terms, _vague_words_result
+from readablity import _difficulty_result
+
+WORD_RUN = re.compile(r"\w+")
+SENTENCE_END = re.compile(r"[.!?]+")
+# textstat.remove_punctuation (apostrophes in contractions are kept)
+NONCONTRACTION_APOSTROPHE = re.compile(r"\'(?![tsd]|ve|ll|re)")
+PUNCTUATION = re.compile(r"[^\w\s\']")
+
+
+def _remove_punctuation(text):
+    return PUNCTUATION.sub("", NONCONTRACTION_APOSTROPHE.sub("", text))
+
+
+@dataclass
+class TextStats:
+    chars: int = 0
+    words: int = 0                # textstat lexicon_count
+    syllables: int = 0
+    difficult: set = field(default_factory=set)
+    word_runs: int = 0            # \b\w+\b count (vague density denominator)
+    vague_terms: Counter = field(default_factory=Counter)
+
+    # Sentence pieces: words before the first sentence end, words after the
+    # last one, and the finished pieces in between with more than two words
+    has_sentence_end: bool = False
+    head_words: int = 0
+    tail_words: int = 0
+    full_sentences: int = 0
+
+    def __add__(self, other):
+        if not isinstance(other, TextStats):
+            return NotImplemented
+        if not self.chars:
+            return other.copy()
+        if not other.chars:
+            return self.copy()
+
+        merged = TextStats(
+            chars=self.chars + 1 + other.chars,   # pages are joined with "\n"
+            words=self.words + other.words,
+            syllables=self.syllables + other.syllables,
+            difficult=self.difficult | other.difficult,
+            word_runs=self.word_runs + other.word_runs,
+            vague_terms=self.vague_terms + other.vague_terms,
+        )
+
+        if not self.has_sentence_end and not other.has_sentence_end:
+            merged.head_words = merged.tail_words = self.head_words + other.head_words
+        elif not self.has_sentence_end:
+            merged.has_sentence_end = True
+            merged.head_words = self.head_words + other.head_words
+            merged.tail_words = other.tail_words
+            merged.full_sentences = other.full_sentences
+        elif not other.has_sentence_end:
+            merged.has_sentence_end = True
+            merged.head_words = self.head_words
+            merged.tail_words = self.tail_words + other.head_words
+            merged.full_sentences = self.full_sentences
+        else:
+            merged.has_sentence_end = True
+            merged.head_words = self.head_words
+            merged.tail_words = other.tail_words
+            merged.full_sentences = (
+                self.full_sentences + other.full_sentences
+                + (self.tail_words + other.head_words > 2)
+            )
+
+        return merged
+
+    def copy(self):
+        return TextStats(
+            self.chars, self.words, self.syllables, set(self.difficult),
+            self.word_runs, Counter(self.vague_terms), self.has_sentence_end,
+            self.head_words, self.tail_words, self.full_sentences
+        )
+
+    @property
+    def sentences(self) -> int:
+        if not self.chars:
+            return 0
+
+        pieces = self.full_sentences + (self.head_words > 2)
+        if self.has_sentence_end:
+            pieces += self.tail_words > 2
+        return max(1, pieces)
+
+    def flesch_reading_ease(self) -> float:
+        if not self.words or not self.sentences or not self.syllables:
+            return 0.0
+        return (
+            206.835
+            - 1.015 * (self.words / self.sentences)
+            - 84.6 * (self.syllables / self.words)
+        )
+
+    def difficulty_score(self) -> dict:
+        return _difficulty_result(
+            self.flesch_reading_ease(), self.words, self.sentences, len(self.difficult)
+        )
+
+    def vague_words_score(self) -> dict:
+        return _vague_words_result(self.vague_terms, self.word_runs)
+
+
+# -----------------------------
+# Per-token analysis (cached: report vocabularies repeat a lot)
+# -----------------------------
+_token_cache = {}
+TOKEN_CACHE_SIZE = 200_000
+
+
+def _analyse_token(token):
+    import textstat
+
+    word = _remove_punctuation(token)
+    parts = SENTENCE_END.split(token)
+
+    info = (
+        len(WORD_RUN.findall(token)),
+        1 if word else 0,
+        textstat.syllable_count(word) if word else 0,
+        word if word and textstat.is_difficult_word(word) else None,
+        # words in each sentence piece this token touches (one entry if it has no . ! ?)
+        tuple(1 if _remove_punctuation(p) else 0 for p in parts),
+    )
+
+    if len(_token_cache) >= TOKEN_CACHE_SIZE:
+        _token_cache.clear()
+    _token_cache[token] = info
+    return info
+
+
+def scan_text(text: str, vague_matches=None) -> TextStats:
+    """
+    One pass over the page for word, sentence, syllable and difficult-word
+    counts, plus the vague-term scan (skipped when the caller already has the
+    page's find_vague_terms matches). Returns a mergeable TextStats.
+    """
+    stats = TextStats(chars=len(text))
+    if not text:
+        return stats
+
+    open_words = 0
+    for token in text.split():
+        info = _token_cache.get(token) or _analyse_token(token)
+        runs, is_word, syllables, difficult, part_words = info
+
+        stats.word_runs += runs
+        stats.words += is_word
+        stats.syllables += syllables
+        if difficult is not None:
+            stats.difficult.add(difficult)
+
+        if len(part_words) == 1:
+            open_words += part_words[0]
+            continue
+
+        # The token contains sentence ends: close the open piece, count the
+        # pieces inside the token, and start a new piece with its last part
+        first = open_words + part_words[0]
+        if stats.has_sentence_end:
+            stats.full_sentences += first > 2
+        else:
+            stats.has_sentence_end = True
+            stats.head_words = first
+
+        stats.full_sentences += sum(1 for w in part_words[1:-1] if w > 2)
+        open_words = part_words[-1]
+
+    if stats.has_sentence_end:
+        stats.tail_words = open_words
+    else:
+        stats.head_words = stats.tail_words = open_words
+
+    if vague_matches is None:
+        vague_matches = find_vague_terms(text)
+    stats.vague_terms.update(term for _, _, term in vague_matches)
+    return stats
+
+
+def scan_pages(pages) -> TextStats:
+    total = TextStats()
+    for page in pages:
+        total = total + scan_text(page)
+    return total
@@ -0,0 +1,143 @@
+"""
+Layout clean-up of PDF page text before sentence splitting.
+
+PyPDF2 returns every page with its running header, footer and page number,
+and keeps the line breaks of the layout. Left alone, these get glued into
+sentences ("65\\nStakeholders & Materiality ... We reduced"). PageNormalizer:
+
+  - drops lines near the top or bottom of a page (EDGE_LINES) that repeat on
+    REPEAT_MIN_PAGES or more pages, comparing them with numbers masked out
+  - drops bare page numbers at the top or bottom ("12", "Page 12", "12 of 80")
+  - joins words hyphenated across a line break ("emis-\\nsions")
+  - turns line breaks inside a sentence into spaces
+
+Pages are streamed: the first LOOKAHEAD_PAGES pages are buffered to learn
+the headers, after which every page is cleaned as it arrives (headers first
+seen later are learned on the way). report() says how much text was removed.
+"""
+import os
+import re
+from collections import Counter
+
+try:
+    from tracing import span
+except ImportError:   # run as a standalone script: no tracing
+    from contextlib import nullcontext
+
+    def span(name, items=None, **attrs):
+        return nullcontext()
+
+TEXT_NORMALIZE = os.getenv("TEXT_NORMALIZE", "1") != "0"
+EDGE_LINES = 3            # lines at the top and at the bottom of a page that can be a header or footer
+REPEAT_MIN_PAGES = 3      # pages a line has to appear on to count as a header or footer
+LOOKAHEAD_PAGES = 8
+REPORT_EXAMPLES = 10
+
+NUMBERS = re.compile(r"\d+")
+PAGE_NUMBER = re.compile(r"^\s*(?:page\s*)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?\s*$", re.IGNORECASE)
+HYPHEN_BREAK = re.compile(r"(?<=[^\W\d_])-[ \t]*\n[ \t]*(?=[a-z])")
+SOFT_BREAK = re.compile(r"(?<=[^.!?:;\s])[ \t]*\n[ \t]*(?=[a-z0-9(])")
+
+
+def line_key(line: str) -> str:
+    return NUMBERS.sub("#", " ".join(line.split()).lower())
+
+
+def _edge_indices(lines, edge_lines=EDGE_LINES):
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return set(filled[:edge_lines] + filled[-edge_lines:])
+
+
+class PageNormalizer:
+    def __init__(self, edge_lines=EDGE_LINES, min_pages=REPEAT_MIN_PAGES, lookahead=LOOKAHEAD_PAGES):
+        self.edge_lines = edge_lines
+        self.min_pages = min_pages
+        self.lookahead = lookahead
+
+        self.edge_counts = Counter()   # line key -> pages it was seen on (at a page edge)
+        self.removed = Counter()       # line key -> times removed
+        self.pages = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.header_lines = 0
+        self.page_numbers = 0
+        self.hyphenations = 0
+        self.line_breaks = 0
+
+    def _learn(self, lines):
+        keys = {line_key(lines[i]) for i in _edge_indices(lines, self.edge_lines)}
+        self.edge_counts.update(k for k in keys if k)
+
+    def _clean(self, page, lines):
+        kept = []
+        edges = _edge_indices(lines, self.edge_lines)
+
+        for i, line in enumerate(lines):
+            if i in edges:
+                if PAGE_NUMBER.match(line):
+                    self.page_numbers += 1
+                    continue
+                key = line_key(line)
+                if self.edge_counts[key] >= self.min_pages:
+                    self.header_lines += 1
+                    self.removed[key] += 1
+                    continue
+            kept.append(line)
+
+        text, joined = HYPHEN_BREAK.subn("", "\n".join(kept))
+        text, collapsed = SOFT_BREAK.subn(" ", text)
+        text = text.strip()
+
+        self.pages += 1
+        self.hyphenations += joined
+        self.line_breaks += collapsed
+        self.chars_in += len(page)
+        self.chars_out += len(text)
+        return text
+
+    def iter_pages(self, pages):
+        """
+        Yields the cleaned text of each page, in order. Pages left empty are skipped.
+        """
+        buffered = []
+        for page in pages:
+            lines = page.split("\n")
+            self._learn(lines)
+
+            if buffered is not None:
+                buffered.append((page, lines))
+                if len(buffered) < self.lookahead:
+                    continue
+                ready, buffered = buffered, None
+            else:
+                ready = [(page, lines)]
+
+            for raw, raw_lines in ready:
+                with span("normalize.page", items=len(raw), unit="chars"):
+                    text = self._clean(raw, raw_lines)
+                if text:
+                    yield text
+
+        for raw, raw_lines in buffered or []:
+            with span("normalize.page", items=len(raw), unit="chars"):
+                text = self._clean(raw, raw_lines)
+            if text:
+                yield text
+
+    def normalize(self, pages):
+        return list(self.iter_pages(pages))
+
+    def report(self) -> dict:
+        removed = self.chars_in - self.chars_out
+        return {
+            "pages": self.pages,
+            "chars_in": self.chars_in,
+            "chars_out": self.chars_out,
+            "removed_chars": removed,
+            "removed_percent": round(removed / self.chars_in * 100, 2) if self.chars_in else 0.0,
+            "header_lines_removed": self.header_lines,
+            "page_numbers_removed": self.page_numbers,
+            "hyphenations_joined": self.hyphenations,
+            "line_breaks_collapsed": self.line_breaks,
+            "top_removed_lines": dict(self.removed.most_common(REPORT_EXAMPLES))
+        }
@@ -1,4 +1,5 @@
 import re
+from collections import Counter
 
 VAGUE_TERMS = [
 
@@ -59,22 +60,59 @@ VAGUE_TERMS = [
 ]
 
 
-def calculate_vague_words_score(text: str) -> dict:
+WORD_PATTERN = re.compile(r"\b\w+\b")
+
+
+def _trie_regex(terms):
     """
-    Calculates vague word density and returns score (0–100)
+    Builds one alternation from a character trie of the terms.
+    Optional branches are greedy, so at each position the longest term wins.
     """
-    text = text.lower()
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if end else group
 
-    # Total words
-    words = re.findall(r"\b\w+\b", text)
-    total_words = len(words)
+    return build(trie)
 
-    # Count vague term occurrences (phrase-safe)
-    vague_count = 0
-    for term in VAGUE_TERMS:
-        pattern = r"\b" + re.escape(term) + r"\b"
-        matches = re.findall(pattern, text)
-        vague_count += len(matches)
+
+def compile_vague_matcher(terms=VAGUE_TERMS):
+    return re.compile(r"\b" + _trie_regex([t.lower() for t in terms]) + r"\b", re.IGNORECASE)
+
+
+VAGUE_PATTERN = compile_vague_matcher()
+
+
+def find_vague_terms(text: str):
+    """
+    Scans the text once and returns (start, end, term) for every vague term.
+    Overlapping terms are counted once: "green energy" is not also "green".
+    """
+    return [(m.start(), m.end(), m.group(0).lower()) for m in VAGUE_PATTERN.finditer(text)]
+
+
+def _count_words_and_terms(text: str):
+    total_words = len(WORD_PATTERN.findall(text))
+    term_counts = Counter(term for _, _, term in find_vague_terms(text))
+    return total_words, term_counts
+
+
+def _vague_words_result(term_counts, total_words):
+    vague_count = sum(term_counts.values())
 
     # Density-based scoring
     vague_density = vague_count / max(total_words, 1)
@@ -84,5 +122,15 @@ def calculate_vague_words_score(text: str) -> dict:
         "vague_terms_found": vague_count,
         "total_words": total_words,
         "vague_density": round(vague_density, 5),
-        "vague_words_score": vague_score
+        "vague_words_score": vague_score,
+        "term_counts": dict(term_counts.most_common())
     }
+
+
+def calculate_vague_words_score(text: str) -> dict:
+    """
+    Calculates vague word density and returns score (0–100)
+    """
+    total_words, term_counts = _count_words_and_terms(text)
+    return _vague_words_result(term_counts, total_words)
+
@@ -1,15 +1,49 @@
 import json
+import os
+import sys
 from pathlib import Path
 from collections import defaultdict
 
-import spacy
-import networkx as nx
-from sklearn.metrics.pairwise import cosine_similarity
+try:
+    from tracing import span
+except ImportError:   # run as a standalone script: no tracing
+    from contextlib import nullcontext
+
+    def span(name, items=None, **attrs):
+        return nullcontext()
 
 # -----------------------------
-# Load spaCy model
+# Load spaCy model (on first use)
 # -----------------------------
-nlp = spacy.load("en_core_web_md")
+SPACY_MODEL = "en_core_web_md"
+# "mmap": memory-mapped export of the model's vectors (vector_table.py)
+# "spacy": full spaCy pipeline
+VECTOR_BACKEND = os.getenv("SPACY_VECTOR_BACKEND", "mmap")
+
+_nlp = None
+_vector_table = None
+_vector_cache = None
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load(SPACY_MODEL)
+    return _nlp
+
+def get_vector_table():
+    global _vector_table
+    if _vector_table is None:
+        from vector_table import open_table
+        _vector_table = open_table(SPACY_MODEL)
+    return _vector_table
+
+def get_vector_cache():
+    global _vector_cache
+    if _vector_cache is None:
+        from vector_table import SentenceVectorCache
+        _vector_cache = SentenceVectorCache(get_vector_table().version)
+    return _vector_cache
 
 # -----------------------------
 # Environmental Themes
@@ -46,79 +80,307 @@ ENV_THEMES = {
 # -----------------------------
 # Theme Classification
 # -----------------------------
-def classify_environmental(sentence: str) -> str:
-    text = sentence.lower()
-    scores = {}
+OTHER_THEME = "Other Environmental"
+CORPUS_SEPARATOR = "\x00"   # never matched by any term, acts like a string edge
+# Terms match whole tokens, where a token is a word with optional decimal
+# parts ("1.5", "co2e"): "wind" never matches "window", "1.5" never matches "21.5".
+# Like the old substring matching, plurals ("plastics", "landfills"), compounds
+# ending in a term ("groundwater") and unit-prefixed terms ("tco2e") still match.
+COMPOUND_PREFIXES = ("ground", "fresh", "rain", "storm", "sea", "surface", "t", "kt", "mt")
+TOKEN_START = "(?:(?<!\\w)(?<!\\w\\.)|" + "|".join(f"(?<=(?<!\\w){p})" for p in COMPOUND_PREFIXES) + ")"
+INFLECTION = r"(?:e?s)?"
+TOKEN_END = r"(?!\w)(?!\.\w)"
+
+_theme_matrix = None
+
+def _normalize_term(text):
+    return " ".join(text.lower().split())
+
+def _trie_regex(terms):
+    """
+    One alternation built from a character trie of the terms (much faster
+    than a flat alternation); spaces inside a term match any whitespace.
+    """
+    import re
+
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        end = "" in node
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + build(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if end else group
+
+    return build(trie)
+
+class ThemeMatrix:
+    """
+    A theme lexicon compiled into sparse matrices:
+      implied     term x term, a matched term also contains the shorter terms
+                  inside it ("clean energy" -> "energy")
+      term_theme  term x theme, which themes list each term
+    A claim's theme scores are the number of distinct lexicon terms it contains.
+    """
+
+    def __init__(self, themes):
+        import re
+        from scipy import sparse
 
-    for theme, keywords in ENV_THEMES.items():
-        scores[theme] = sum(1 for kw in keywords if kw in text)
+        self.themes = list(themes)
 
-    best_theme = max(scores, key=scores.get)
-    return best_theme if scores[best_theme] > 0 else "Other Environmental"
+        self.terms = {}
+        rows, cols = [], []
+        for col, theme in enumerate(self.themes):
+            for kw in themes[theme]:
+                row = self.terms.setdefault(_normalize_term(kw), len(self.terms))
+                rows.append(row)
+                cols.append(col)
+
+        n_terms = len(self.terms)
+        self.term_theme = sparse.csr_matrix(
+            ([1] * len(rows), (rows, cols)), shape=(n_terms, len(self.themes)), dtype="int32"
+        )
+        self.term_theme.data[:] = 1   # a term listed twice under a theme counts once
+
+        # The longest term wins at each position; the lookahead finds a match at
+        # every token start, so terms that begin inside another match are found too
+        self.pattern = re.compile(f"{TOKEN_START}(?=({_trie_regex(self.terms)}){INFLECTION}{TOKEN_END})")
+
+        rows, cols = [], []
+        for term, row in self.terms.items():
+            for other, col in self.terms.items():
+                if re.search(f"{TOKEN_START}{re.escape(other)}{INFLECTION}{TOKEN_END}", term):
+                    rows.append(row)
+                    cols.append(col)
+        self.implied = sparse.csr_matrix(
+            ([1] * len(rows), (rows, cols)), shape=(n_terms, n_terms), dtype="int32"
+        )
+
+    def scores(self, sentences):
+        """
+        Sparse claim-by-theme score matrix (one row per sentence, columns in self.themes order).
+        The whole claim set is scanned as one string.
+        """
+        import numpy as np
+        from scipy import sparse
+
+        sentences = [s.lower().replace(CORPUS_SEPARATOR, " ") for s in sentences]
+        n = len(sentences)
+
+        lengths = np.fromiter((len(s) + 1 for s in sentences), dtype=np.int64, count=n)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        corpus = CORPUS_SEPARATOR.join(sentences)
+
+        positions, term_ids = [], []
+        for m in self.pattern.finditer(corpus):
+            positions.append(m.start())
+            term_ids.append(self.terms[_normalize_term(m.group(1))])
+
+        doc_ids = np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side="right") - 1
+        doc_terms = sparse.csr_matrix(
+            (np.ones(len(term_ids), dtype=np.int32), (doc_ids, term_ids)),
+            shape=(n, len(self.terms))
+        )
+
+        # distinct terms per claim, including the ones inside longer matches
+        present = doc_terms @ self.implied
+        present.data[:] = 1
+        return (present @ self.term_theme).tocsr()
+
+def get_theme_matrix():
+    global _theme_matrix
+    if _theme_matrix is None:
+        _theme_matrix = ThemeMatrix(ENV_THEMES)
+    return _theme_matrix
+
+def theme_score_matrix(sentences, themes=None):
+    """
+    Returns (scores, theme_names): the sparse claim-by-theme score matrix for
+    all sentences, from ENV_THEMES or the given lexicon.
+    """
+    matrix = get_theme_matrix() if themes is None else ThemeMatrix(themes)
+    return matrix.scores(sentences), matrix.themes
+
+def classify_claims(sentences, themes=None):
+    """
+    Best theme for each sentence (ties go to the theme listed first),
+    or OTHER_THEME when no lexicon term matches.
+    """
+    import numpy as np
+
+    if not len(sentences):
+        return []
+
+    scores, theme_names = theme_score_matrix(sentences, themes)
+
+    dense = scores.toarray()
+    best = dense.argmax(axis=1)
+    matched = dense[np.arange(len(best)), best] > 0
+    return [theme_names[b] if m else OTHER_THEME for b, m in zip(best, matched)]
+
+def classify_environmental(sentence: str) -> str:
+    return classify_claims([sentence])[0]
 
 # -----------------------------
 # TextRank using spaCy vectors
 # -----------------------------
+PIPE_BATCH_SIZE = 256
+TEXTRANK_WORKERS = 4
+PAGERANK_ALPHA = 0.85
+PAGERANK_MAX_ITER = 100
+PAGERANK_TOL = 1.0e-6
+
+def _spacy_vectors(sentences):
+    import numpy as np
+
+    # Only the static word vectors are used, so every pipeline component is skipped
+    nlp = get_nlp()
+    vectors = np.zeros((len(sentences), nlp.vocab.vectors_length), dtype=np.float32)
+    docs = nlp.pipe(sentences, batch_size=PIPE_BATCH_SIZE, disable=nlp.pipe_names)
+    for i, doc in enumerate(docs):
+        vectors[i] = doc.vector
+    return vectors
+
+def encode_sentences(sentences):
+    """
+    Unit-length float32 sentence vectors (rows of zeros for sentences with no vectors).
+    """
+    import numpy as np
+
+    if VECTOR_BACKEND == "spacy":
+        vectors = _spacy_vectors(sentences)
+    else:
+        from vector_table import cached_sentence_vectors
+        vectors = cached_sentence_vectors(get_vector_table(), get_vector_cache(), sentences)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+def pagerank(weights, alpha=PAGERANK_ALPHA, max_iter=PAGERANK_MAX_ITER, tol=PAGERANK_TOL):
+    """
+    Power-iteration PageRank on a dense weighted adjacency matrix.
+    Same update and stopping rule as networkx.pagerank (rows with no weight
+    spread their rank uniformly).
+    """
+    import numpy as np
+
+    n = weights.shape[0]
+    row_sums = weights.sum(axis=1)
+    dangling = row_sums == 0
+    transition = np.divide(
+        weights, row_sums[:, None],
+        out=np.zeros_like(weights), where=~dangling[:, None]
+    )
+
+    x = np.full(n, 1.0 / n, dtype=weights.dtype)
+    for _ in range(max_iter):
+        x_last = x
+        x = alpha * (x @ transition + x[dangling].sum() / n) + (1 - alpha) / n
+        if np.abs(x - x_last).sum() < n * tol:
+            return x
+
+    raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+
+def _textrank_from_vectors(vectors):
+    scores = pagerank(vectors @ vectors.T)
+    return {i: float(score) for i, score in enumerate(scores)}
+
 def textrank_scores(sentences):
-    docs = [nlp(s) for s in sentences]
-    vectors = [doc.vector for doc in docs]
+    return _textrank_from_vectors(encode_sentences(sentences))
 
-    similarity_matrix = cosine_similarity(vectors, vectors)
+def textrank_by_theme(theme_groups, workers=TEXTRANK_WORKERS):
+    """
+    TextRank for every theme with more than one claim. All sentences are
+    encoded in one batched pass; the per-theme PageRanks then run in parallel.
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-    graph = nx.from_numpy_array(similarity_matrix)
-    scores = nx.pagerank(graph)
+    ranked = {theme: s for theme, s in theme_groups.items() if len(s) > 1}
+    if not ranked:
+        return {}
 
-    return scores
+    all_sentences = [s for sentences in ranked.values() for s in sentences]
+    with span("textrank.encode", items=len(all_sentences)):
+        vectors = encode_sentences(all_sentences)
+
+    blocks = {}
+    start = 0
+    for theme, sentences in ranked.items():
+        blocks[theme] = vectors[start:start + len(sentences)]
+        start += len(sentences)
+
+    with span("textrank.pagerank", items=len(all_sentences), themes=len(blocks)):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {theme: pool.submit(_textrank_from_vectors, block) for theme, block in blocks.items()}
+            return {theme: future.result() for theme, future in futures.items()}
 
 # -----------------------------
-# Main Pipeline
+# Theme metrics for a claim set
 # -----------------------------
-def main():
-    input_path = Path("claims_extractor/claims.json")
-    output_path = Path("claimtoclassify/environmental_claim_analysis.json")
-
-    with open(input_path, "r", encoding="utf-8") as f:
-        claims = json.load(f)
+def analyze_themes(claims):
+    """
+    Groups claims by environmental theme and ranks each group with TextRank.
+    Returns the theme_metrics dict written to environmental_claim_analysis.json.
+    """
+    return analyze_theme_sentences([claim["sentence"] for claim in claims])
 
+def analyze_theme_sentences(sentences):
     theme_groups = defaultdict(list)
-    classified_claims = []
 
     # Step 1: Classify claims
-    for claim in claims:
-        sentence = claim["sentence"]
-        confidence = claim["confidence"]
-
-        theme = classify_environmental(sentence)
-
-        classified_claims.append({
-            "sentence": sentence,
-            "confidence": confidence,
-            "theme": theme
-        })
-
+    with span("themes.classify", items=len(sentences)):
+        themes = classify_claims(sentences)
+    for sentence, theme in zip(sentences, themes):
         theme_groups[theme].append(sentence)
 
     # Step 2: Claim density + TextRank
-    total_claims = len(classified_claims)
+    total_claims = len(sentences)
+    theme_scores = textrank_by_theme(theme_groups)
     theme_metrics = {}
 
-    for theme, sentences in theme_groups.items():
-        density = round(len(sentences) / total_claims * 100, 2)
-
-        if len(sentences) > 1:
-            scores = textrank_scores(sentences)
-        else:
-            scores = {}
+    for theme, theme_sentences in theme_groups.items():
+        density = round(len(theme_sentences) / total_claims * 100, 2)
+        scores = theme_scores.get(theme, {})
 
         theme_metrics[theme] = {
-            "claim_count": len(sentences),
+            "claim_count": len(theme_sentences),
             "claim_density_percent": density,
             "textrank_scores": {
-                sentences[i]: round(score, 4)
+                theme_sentences[i]: round(score, 4)
                 for i, score in scores.items()
             }
         }
 
+    return theme_metrics
+
+# -----------------------------
+# Main Pipeline
+# -----------------------------
+def main(input_path="claims_extractor/claims.json",
+         output_path="claimtoclassify/environmental_claim_analysis.json"):
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+
+    with open(input_path, "r", encoding="utf-8") as f:
+        claims = json.load(f)
+
+    theme_metrics = analyze_themes(claims)
+
     # Save output
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump({
@@ -132,4 +394,5 @@ def main():
 # Run
 # -----------------------------
 if __name__ == "__main__":
-    main()
+    # python claimtoclassify/sum_class.py [claims.json] [output.json]
+    main(*sys.argv[1:3])
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 import re
+import sys
 
 # -----------------------------
 # Helper: count numbers in a sentence
@@ -9,32 +10,24 @@ def count_numbers(sentence):
     # Matches digits, decimals, percentages, tCO2e, GJ, etc.
     return len(re.findall(r"\d+(\.\d+)?|\d+%|tCO2e|GJ", sentence))
 
+MAX_SENTENCE_LENGTH = 250  # skip very long sentences
+TOP_N = 5                  # top number-heavy sentences
+
 # -----------------------------
-# Main pipeline
+# Top number-heavy claims per theme
 # -----------------------------
-def main():
-    input_path = Path("claimtoclassify/environmental_claim_analysis.json")
-    output_path = Path("claimtoclassify/theme_summaries.json")
-
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    theme_metrics = data["theme_metrics"]
-
-    MAX_SENTENCE_LENGTH = 250  # skip very long sentences
-    TOP_N = 5                  # top number-heavy sentences
-
+def summarize_themes(theme_metrics, max_sentence_length=MAX_SENTENCE_LENGTH, top_n=TOP_N):
     theme_summaries = {}
 
     for theme, details in theme_metrics.items():
         # Filter sentences by length
-        sentences = [s for s in details["textrank_scores"].keys() if len(s) <= MAX_SENTENCE_LENGTH]
+        sentences = [s for s in details["textrank_scores"].keys() if len(s) <= max_sentence_length]
 
         # Rank sentences by number count
         ranked = sorted(sentences, key=count_numbers, reverse=True)
 
         # Take top N number-heavy sentences
-        top_number_claims = ranked[:TOP_N]
+        top_number_claims = ranked[:top_n]
 
         # Store directly in theme_summaries.json
         theme_summaries[theme] = {
@@ -43,6 +36,21 @@ def main():
             "top_number_claims": top_number_claims
         }
 
+    return theme_summaries
+
+# -----------------------------
+# Main pipeline
+# -----------------------------
+def main(input_path="claimtoclassify/environmental_claim_analysis.json",
+         output_path="claimtoclassify/theme_summaries.json"):
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+
+    with open(input_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    theme_summaries = summarize_themes(data["theme_metrics"])
+
     # Save output
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(theme_summaries, f, indent=2, ensure_ascii=False)
@@ -60,4 +68,5 @@ def main():
 # Run
 # -----------------------------
 if __name__ == "__main__":
-    main()
+    # python claimtoclassify/summarizer_to_claims.py [environmental_claim_analysis.json] [output.json]
+    main(*sys.argv[1:3])
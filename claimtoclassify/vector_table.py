@@ -0,0 +1,319 @@
+"""
+Memory-mapped word vectors for the theming stage.
+
+sum_class only needs the static word vectors of the spaCy model, so the
+vector table is exported once to plain NumPy files:
+
+  <SPACY_VECTOR_DIR>/<model>/vectors.npy   float32 vector rows
+  <SPACY_VECTOR_DIR>/<model>/keys.npy      sorted uint64 hashes of the vocabulary strings
+  <SPACY_VECTOR_DIR>/<model>/rows.npy      vector row for each key
+  <SPACY_VECTOR_DIR>/<model>/meta.json
+
+The arrays are opened with mmap_mode="r", so worker processes share one copy
+through the OS page cache. Sentence vectors are the mean of the token vectors
+(tokens without a vector count as zeros), like spaCy's doc.vector.
+
+Export ahead of time with:
+    python claimtoclassify/vector_table.py [model]
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+VECTOR_DIR = os.getenv("SPACY_VECTOR_DIR", ".cache/vectors")
+SENTENCE_VECTOR_DB = os.getenv("SENTENCE_VECTOR_DB", ".cache/sentence_vectors.sqlite3")
+LOOKUP_CHUNK = 500   # stays below SQLite's bound-parameter limit
+
+# Close to spaCy's English tokenizer for the text in reports: abbreviations
+# and decimals stay whole, n't and 's are split off, hyphens are split
+# before letters ("net-zero") and between numbers ("302-1") but not
+# between a letter and a digit ("Scope-3")
+TOKEN_PATTERN = re.compile(r"""
+      (?:[^\W\d_]\.){2,}
+    | \d+(?:[.,]\d+)+
+    | [^\W\d_]+(?=n['’]t\b)
+    | n['’]t\b
+    | ['’](?:s|re|ll|ve|d|m)\b
+    | \w*[^\W\d_](?:-\d\w*)+
+    | \w+(?:-(?!\w))?
+    | \S
+""", re.VERBOSE | re.IGNORECASE)
+
+
+WHITESPACE_RUN = re.compile(r"\s+")
+
+
+def tokenize(text: str):
+    """
+    Like spaCy, a single space after a word is dropped and any other
+    whitespace ("\n", extra spaces) becomes a token of its own.
+    """
+    tokens = []
+    pos = 0
+    for match in WHITESPACE_RUN.finditer(text):
+        tokens.extend(TOKEN_PATTERN.findall(text, pos, match.start()))
+        space = match.group()
+        if match.start() > 0 and space[0] == " ":
+            space = space[1:]
+        if space:
+            tokens.append(space)
+        pos = match.end()
+
+    tokens.extend(TOKEN_PATTERN.findall(text, pos))
+    return tokens
+
+
+def _key(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+# -----------------------------
+# Export
+# -----------------------------
+def table_dir(model_name: str, vector_dir=VECTOR_DIR) -> Path:
+    return Path(vector_dir) / Path(model_name).name
+
+
+def export_vectors(model_name: str, vector_dir=VECTOR_DIR) -> Path:
+    """
+    Writes the spaCy model's vector table as memory-mappable .npy files.
+    This is the only step that loads spaCy.
+
+    Worker processes may export at the same time on a cold cache, so the
+    files are written to a private temp directory and each is renamed into
+    place, meta.json last: a table whose meta.json exists is complete.
+    """
+    import spacy
+
+    nlp = spacy.load(model_name, exclude=["tagger", "parser", "ner", "lemmatizer",
+                                          "attribute_ruler", "tok2vec", "senter"])
+    vectors = nlp.vocab.vectors
+    strings = nlp.vocab.strings
+
+    keys, rows = [], []
+    for orth, row in vectors.key2row.items():
+        if orth in strings:
+            keys.append(_key(strings[orth]))
+            rows.append(row)
+
+    keys = np.array(keys, dtype=np.uint64)
+    rows = np.array(rows, dtype=np.int64)
+    order = np.argsort(keys)
+    data = np.ascontiguousarray(vectors.data, dtype=np.float32)
+
+    out = table_dir(model_name, vector_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    tmp = out.parent / f".{out.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+    tmp.mkdir()
+
+    digest = hashlib.sha256(data.tobytes())
+    digest.update(keys[order].tobytes())
+    meta = {
+        "model": model_name,
+        "spacy_version": spacy.__version__,
+        "model_version": nlp.meta.get("version"),
+        "vectors_length": int(data.shape[1]),
+        "keys": int(len(keys)),
+        "version": digest.hexdigest()[:16]
+    }
+
+    try:
+        np.save(tmp / "vectors.npy", data)
+        np.save(tmp / "keys.npy", keys[order])
+        np.save(tmp / "rows.npy", rows[order])
+        with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        # Readers that already mapped an earlier copy keep their (identical) file
+        for name in ("vectors.npy", "keys.npy", "rows.npy", "meta.json"):
+            os.replace(tmp / name, out / name)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return out
+
+# -----------------------------
+# Memory-mapped table
+# -----------------------------
+class VectorTable:
+    def __init__(self, path):
+        path = Path(path)
+        with open(path / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.version = self.meta["version"]
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        self.keys = np.load(path / "keys.npy", mmap_mode="r")
+        self.rows = np.load(path / "rows.npy", mmap_mode="r")
+
+    @property
+    def vectors_length(self) -> int:
+        return self.vectors.shape[1]
+
+    def token_rows(self, tokens):
+        """
+        Vector row for each token, or -1 if the token has no vector.
+        """
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+
+        keys = np.fromiter((_key(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+        pos = np.searchsorted(self.keys, keys)
+        pos = np.minimum(pos, len(self.keys) - 1)
+        found = self.keys[pos] == keys
+        return np.where(found, self.rows[pos], -1)
+
+    def sentence_vectors(self, sentences):
+        """
+        float32 matrix of averaged token vectors, one row per sentence.
+        """
+        out = np.zeros((len(sentences), self.vectors_length), dtype=np.float32)
+        if not sentences or not len(self.keys):
+            return out
+
+        tokens = [tokenize(s) for s in sentences]
+        rows = self.token_rows([t for sent in tokens for t in sent])
+
+        start = 0
+        for i, sent in enumerate(tokens):
+            sent_rows = rows[start:start + len(sent)]
+            start += len(sent)
+            hits = sent_rows[sent_rows >= 0]
+            if len(hits):
+                out[i] = self.vectors[hits].sum(axis=0) / len(sent)
+        return out
+
+
+def open_table(model_name: str, vector_dir=VECTOR_DIR) -> VectorTable:
+    """
+    Opens the exported table for model_name, exporting it first if needed.
+    """
+    path = table_dir(model_name, vector_dir)
+    if not (path / "meta.json").exists():
+        export_vectors(model_name, vector_dir)
+    return VectorTable(path)
+
+# -----------------------------
+# Persistent sentence-vector cache
+# -----------------------------
+class SentenceVectorCache:
+    """
+    SQLite table of sentence vectors keyed by (sentence hash, vector table version).
+    """
+
+    def __init__(self, table_version: str, db_path=SENTENCE_VECTOR_DB):
+        self.table_version = table_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sentence_vectors (
+                sentence_hash TEXT NOT NULL,
+                table_version TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (sentence_hash, table_version)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _hash(sentence: str) -> str:
+        # Vectors are case-sensitive, so the text is hashed as is
+        return hashlib.sha256(sentence.encode("utf-8")).hexdigest()
+
+    def lookup(self, sentences):
+        """
+        Returns a list aligned with sentences: the cached float32 vector, or None.
+        """
+        hashes = [self._hash(s) for s in sentences]
+        found = {}
+
+        with self._lock:
+            unique = list(set(hashes))
+            for start in range(0, len(unique), LOOKUP_CHUNK):
+                chunk = unique[start:start + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT sentence_hash, vector FROM sentence_vectors "
+                    f"WHERE table_version = ? AND sentence_hash IN ({placeholders})",
+                    [self.table_version, *chunk]
+                )
+                found.update(rows)
+
+        vectors = [
+            np.frombuffer(found[h], dtype=np.float32) if h in found else None
+            for h in hashes
+        ]
+        hits = sum(1 for v in vectors if v is not None)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def store(self, sentences, vectors):
+        rows = [
+            (self._hash(s), self.table_version, np.asarray(v, dtype=np.float32).tobytes())
+            for s, v in zip(sentences, vectors)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentence_vectors (sentence_hash, table_version, vector) "
+                "VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cached_sentence_vectors(table: VectorTable, cache: SentenceVectorCache, sentences):
+    """
+    Sentence vectors from the cache where possible; only distinct misses are computed.
+    """
+    out = np.zeros((len(sentences), table.vectors_length), dtype=np.float32)
+    missing = {}
+
+    for i, vector in enumerate(cache.lookup(sentences)):
+        if vector is None:
+            missing.setdefault(sentences[i], []).append(i)
+        else:
+            out[i] = vector
+
+    if missing:
+        todo = list(missing)
+        computed = table.sentence_vectors(todo)
+        cache.store(todo, computed)
+        for sentence, vector in zip(todo, computed):
+            out[missing[sentence]] = vector
+
+    return out
+
+
+if __name__ == "__main__":
+    model = sys.argv[1] if len(sys.argv) > 1 else "en_core_web_md"
+    path = export_vectors(model)
+    print(f"✅ Vector table for {model} saved to {path}")
@@ -2,12 +2,16 @@ import pandas as pd
 
 import streamlit as st
 import tempfile
-import subprocess
 import json
 import os
 
-from analyze.scrapper import fetch_and_save_esg
-from analyze.getting_accuracy import evaluate_themes
+import pipeline
+import runs
+
+@st.cache_resource
+def load_pipeline_models():
+    """Loads the claim classifier and spaCy model once per server process."""
+    return pipeline.load_models()
 
 st.logo(
     "🌿"
@@ -26,6 +30,15 @@ mode = st.radio(
     ("Run Full Analysis", "Use Pre-existing JSON Data")
 )
 
+# Finished runs of every session, newest first
+selected_run = None
+if mode == "Use Pre-existing JSON Data":
+    past_runs = runs.list_runs(status="done")
+    if past_runs:
+        selected_run = st.selectbox("Previous Run", past_runs, format_func=runs.describe_run)
+    else:
+        st.info("No previous runs yet.")
+
 # -----------------------------
 # PROCESS BUTTON
 # -----------------------------
@@ -46,6 +59,9 @@ if st.button("Process", type="primary"):
             st.error("Please enter a company name.")
             st.stop()
 
+        # Each analysis writes to its own run directory
+        run = runs.create_run(company=company_name, report=uploaded_file.name)
+
         with st.spinner("Processing PDF..."):
 
             with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
@@ -53,17 +69,14 @@ if st.button("Process", type="primary"):
                 temp_pdf_path = tmp.name
 
             try:
-                subprocess.run(
-                    ["python", "claims_extractor/run_pdf_claims_extractor.py", temp_pdf_path],
-                    check=True
-                )
-                subprocess.run(["python", "claim_scorer/assertiveness.py"], check=True)
-                subprocess.run(["python", "claimtoclassify/sum_class.py"], check=True)
-                subprocess.run(["python", "claimtoclassify/summarizer_to_claims.py"], check=True)
+                load_pipeline_models()
+                results = pipeline.run_pdf_analysis(temp_pdf_path, run_id=run.run_id)
+                pipeline.save_results(results, run.path)
 
                 st.success("PDF Analysis Completed ✅")
 
             except Exception as e:
+                run.write_meta(status="failed", error=str(e))
                 st.error(f"PDF Analysis Error: {e}")
                 st.stop()
 
@@ -72,61 +85,58 @@ if st.button("Process", type="primary"):
                     os.remove(temp_pdf_path)
 
         # Fetch ESG data
+        from analyze.scrapper import fetch_and_save_esg
         try:
             fetch_and_save_esg(company_name)
             st.success("Company ESG data fetched ✅")
         except Exception as e:
             st.error(f"ESG Fetch Error: {e}")
 
-        # Evaluate themes
+        # Evaluate themes (reuses cached scores for a report seen before)
         try:
-            evaluate_themes(
-                input_path="claimtoclassify/theme_summaries.json",
-                output_path="analyze/theme_summaries_with_scores.json"
-            )
+            pipeline.evaluate_stage(results)
+            pipeline.save_results(results, run.path)
             st.success("Theme evaluation completed ✅")
         except Exception as e:
+            # The local outputs are kept, but the run has no theme scores
+            # and is not offered under "Use Pre-existing JSON Data"
+            pipeline.save_results(results, run.path)
+            run.write_meta(status="failed", error=f"Theme evaluation: {e}",
+                           pdf_hash=results["pdf_hash"], claims=len(results["claims"]))
             st.error(f"Theme Evaluation Error: {e}")
+            st.stop()
 
-        # Save last analyzed company
-        meta_data = {
-            "last_analyzed_company": company_name
-        }
-
-        os.makedirs("analyze", exist_ok=True)
-
-        with open("analyze/session_meta.json", "w") as f:
-            json.dump(meta_data, f)
+        run.write_meta(status="done", pdf_hash=results["pdf_hash"], claims=len(results["claims"]))
+        st.caption(f"Run ID: {run.run_id}")
 
     # ============================================================
     # MODE 2: USE PRE-EXISTING JSON
     # ============================================================
     else:
-        try:
-            with open("analyze/session_meta.json") as f:
-                meta = json.load(f)
-                company_name = meta.get("last_analyzed_company")
-                st.info(f"Using previously analyzed company: {company_name}")
-        except Exception:
+        if selected_run is None:
             st.error("No previous analysis found.")
             st.stop()
 
+        run = runs.RunWorkspace(selected_run["run_id"])
+        company_name = selected_run.get("company")
+        st.info(f"Using previously analyzed company: {company_name} (run {run.run_id})")
+
     # ============================================================
     # LOAD JSON DATA
     # ============================================================
     try:
-        with open("claims_extractor/scores.json") as f:
+        with open(run.artifact(pipeline.SCORES_PATH)) as f:
             scores = json.load(f)
             vague = scores["vague_words_score"]
             difficulty = scores["difficulty_score"]
 
-        with open("claim_scorer/claims_with_scores.json") as f:
+        with open(run.artifact(pipeline.SCORED_CLAIMS_PATH)) as f:
             claims = json.load(f)
 
-        with open("analyze/company_data.json") as f:
-            company_data = json.load(f)
+        from analyze.company_store import get_company_store
+        company_store = get_company_store()
 
-        with open("analyze/theme_summaries_with_scores.json") as f:
+        with open(run.artifact(pipeline.THEME_SCORES_PATH)) as f:
             theme_summaries = json.load(f)
 
     except Exception as e:
@@ -225,7 +235,7 @@ if st.button("Process", type="primary"):
     # ============================================================
     st.subheader("🏢 Company Profile")
 
-    selected_company = company_data.get(company_name)
+    selected_company = company_store.get(company_name)
 
     if selected_company:
 
@@ -267,7 +277,7 @@ if st.button("Process", type="primary"):
         else:
             st.write("No commitments available.")
     else:
-        st.warning(f"Company '{company_name}' not found in company_data.json")
+        st.warning(f"Company '{company_name}' not found in the company store")
 
     with st.expander("🔍 Know About Company Profile"):
         st.markdown(
@@ -325,22 +335,12 @@ try:
     # -------------------------
     # 🧠 Build Current Company Row (LIVE DATA)
     # -------------------------
-    carbon = selected_company.get("carbon_footprint", {}) if selected_company else {}
-
-    # Helper function to strip "tCO2e" and commas from strings
-    def clean_emission_value(val):
-        if isinstance(val, str):
-            # Remove units and commas, then convert to float
-            val = val
-            # .replace("tCO2e", "").replace("(", "").replace(")", "").replace(",", "").strip()
-        try:
-            return float(val)
-        except:
-            return 0.0
+    # numeric tCO2e values parsed when the company was stored
+    scope_values = selected_company.get("scope_values", {}) if selected_company else {}
 
-    scope1 = clean_emission_value(carbon.get("scope1", 0))
-    scope2 = clean_emission_value(carbon.get("scope2", 0))
-    scope3 = clean_emission_value(carbon.get("scope3", 0))
+    scope1 = scope_values.get("scope1") or 0.0
+    scope2 = scope_values.get("scope2") or 0.0
+    scope3 = scope_values.get("scope3") or 0.0
 
     # (Risk and Theme logic remains same for background calculations)
     msci_raw = selected_company.get("ESG_rating", "BBB") if selected_company else "BBB"
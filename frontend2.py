@@ -1,23 +1,11 @@
 import pandas as pd
 import streamlit as st
 import tempfile
-import subprocess
 import json
 import os
-import re
 
-# -----------------------------
-# HELPER FUNCTIONS
-# -----------------------------
-def clean_carbon_value(val):
-    """Removes 'tCO2e', commas, and other text to return a clean float."""
-    if pd.isna(val) or val == "N/A" or val is None:
-        return None
-    clean_str = re.sub(r'[^\d.]', '', str(val))
-    try:
-        return float(clean_str)
-    except ValueError:
-        return None
+import pipeline
+import runs
 
 # -----------------------------
 # RATING HELPERS
@@ -46,6 +34,11 @@ def calc_pct_diff(comp_val, avg_val):
     else:
         return "0.0%"
 
+@st.cache_resource
+def load_pipeline_models():
+    """Loads the claim classifier and spaCy model once per server process."""
+    return pipeline.load_models()
+
 @st.cache_data
 def load_csv_dataset():
     """Loads the benchmark dataset."""
@@ -72,6 +65,15 @@ mode = st.radio(
     ("Run Full Analysis", "Use Pre-existing JSON Data")
 )
 
+# Finished runs of every session, newest first
+selected_run = None
+if mode == "Use Pre-existing JSON Data":
+    past_runs = runs.list_runs(status="done")
+    if past_runs:
+        selected_run = st.selectbox("Previous Run", past_runs, format_func=runs.describe_run)
+    else:
+        st.info("No previous runs yet.")
+
 # -----------------------------
 # PROCESS BUTTON
 # -----------------------------
@@ -92,18 +94,21 @@ if st.button("Process", type="primary"):
             st.error("Please enter a company name.")
             st.stop()
 
+        # Each analysis writes to its own run directory
+        run = runs.create_run(company=company_name, report=uploaded_file.name)
+
         with st.spinner("Processing PDF..."):
             with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
                 tmp.write(uploaded_file.read())
                 temp_pdf_path = tmp.name
 
             try:
-                subprocess.run(["python", "claims_extractor/run_pdf_claims_extractor.py", temp_pdf_path], check=True)
-                subprocess.run(["python", "claim_scorer/assertiveness.py"], check=True)
-                subprocess.run(["python", "claimtoclassify/sum_class.py"], check=True)
-                subprocess.run(["python", "claimtoclassify/summarizer_to_claims.py"], check=True)
+                load_pipeline_models()
+                results = pipeline.run_pdf_analysis(temp_pdf_path, run_id=run.run_id)
+                pipeline.save_results(results, run.path)
                 st.success("PDF Analysis Completed ✅")
             except Exception as e:
+                run.write_meta(status="failed", error=str(e))
                 st.error(f"PDF Analysis Error: {e}")
                 st.stop()
             finally:
@@ -118,58 +123,65 @@ if st.button("Process", type="primary"):
         except Exception as e:
             st.error(f"ESG Fetch Error: {e}")
 
-        # Evaluate themes
-        from analyze.getting_accuracy import evaluate_themes
+        # Evaluate themes (reuses cached scores for a report seen before)
         try:
-            evaluate_themes(
-                input_path="claimtoclassify/theme_summaries.json",
-                output_path="analyze/theme_summaries_with_scores.json"
-            )
+            pipeline.evaluate_stage(results)
+            pipeline.save_results(results, run.path)
             st.success("Theme evaluation completed ✅")
         except Exception as e:
+            # The local outputs are kept, but the run has no theme scores
+            # and is not offered under "Use Pre-existing JSON Data"
+            pipeline.save_results(results, run.path)
+            run.write_meta(status="failed", error=f"Theme evaluation: {e}",
+                           pdf_hash=results["pdf_hash"], claims=len(results["claims"]))
             st.error(f"Theme Evaluation Error: {e}")
+            st.stop()
 
-        # Save last analyzed company
-        meta_data = {"last_analyzed_company": company_name}
-        os.makedirs("analyze", exist_ok=True)
-        with open("analyze/session_meta.json", "w") as f:
-            json.dump(meta_data, f)
+        run.write_meta(status="done", pdf_hash=results["pdf_hash"], claims=len(results["claims"]))
+        st.caption(f"Run ID: {run.run_id}")
 
     # ============================================================
     # MODE 2: USE PRE-EXISTING JSON
     # ============================================================
     else:
-        try:
-            with open("analyze/session_meta.json") as f:
-                meta = json.load(f)
-                company_name = meta.get("last_analyzed_company")
-                st.info(f"Using previously analyzed company: {company_name}")
-        except Exception:
+        if selected_run is None:
             st.error("No previous analysis found.")
             st.stop()
 
+        run = runs.RunWorkspace(selected_run["run_id"])
+        company_name = selected_run.get("company")
+        st.info(f"Using previously analyzed company: {company_name} (run {run.run_id})")
+
     # ============================================================
     # LOAD JSON DATA & CSV BENCHMARKS
     # ============================================================
     try:
-        with open("claims_extractor/scores.json") as f:
+        with open(run.artifact(pipeline.SCORES_PATH)) as f:
             scores = json.load(f)
             vague = scores["vague_words_score"]
             difficulty = scores["difficulty_score"]
+            text_cleanup = scores.get("text_cleanup")
 
-        with open("claim_scorer/claims_with_scores.json") as f:
+        with open(run.artifact(pipeline.SCORED_CLAIMS_PATH)) as f:
             claims = json.load(f)
 
-        with open("analyze/company_data.json") as f:
-            company_data = json.load(f)
+        from analyze.company_store import get_company_store
+        company_store = get_company_store()
 
-        with open("analyze/theme_summaries_with_scores.json") as f:
+        with open(run.artifact(pipeline.THEME_SCORES_PATH)) as f:
             theme_summaries = json.load(f)
             
     except Exception as e:
         st.error(f"Failed to load JSON data: {e}")
         st.stop()
 
+    # Trace of the pipeline run (older runs may not have one)
+    try:
+        with open(run.artifact(pipeline.TRACE_PATH)) as f:
+            run_trace = json.load(f)
+    except Exception:
+        run_trace = None
+
     df_csv = load_csv_dataset()
     avg_label = "Dataset Avg"
     
@@ -215,6 +227,12 @@ if st.button("Process", type="primary"):
     st.progress(vague["vague_words_score"] / 100)
     st.write("**Reading Difficulty Level**")
     st.progress(difficulty["difficulty_to_read_score"] / 100)
+    if text_cleanup:
+        st.caption(
+            f"Scored after removing {text_cleanup['removed_percent']}% of the extracted text: "
+            f"{text_cleanup['header_lines_removed']} header/footer lines and "
+            f"{text_cleanup['page_numbers_removed']} page numbers."
+        )
 
     # ============================================================
     # CLAIM ANALYSIS
@@ -242,7 +260,7 @@ if st.button("Process", type="primary"):
     # COMPANY PROFILE
     # ============================================================
     st.subheader("🏢 Company Profile")
-    selected_company = company_data.get(company_name)
+    selected_company = company_store.get(company_name)
 
     if selected_company:
         colA, colB = st.columns([1, 2])
@@ -277,9 +295,11 @@ if st.button("Process", type="primary"):
             carbon = selected_company.get("carbon_footprint", {})
 
             if carbon:
-                c_scope1 = clean_carbon_value(carbon.get("scope1"))
-                c_scope2 = clean_carbon_value(carbon.get("scope2"))
-                c_scope3 = clean_carbon_value(carbon.get("scope3"))
+                # numeric tCO2e values parsed when the company was stored
+                scope_values = selected_company.get("scope_values", {})
+                c_scope1 = scope_values.get("scope1")
+                c_scope2 = scope_values.get("scope2")
+                c_scope3 = scope_values.get("scope3")
 
                 df_carbon = pd.DataFrame({
                     "Metric": ["Scope 1", "Scope 2", "Scope 3"],
@@ -311,7 +331,7 @@ if st.button("Process", type="primary"):
             else:
                 st.write("No commitments available.")
     else:
-        st.warning(f"Company '{company_name}' not found in company_data.json")
+        st.warning(f"Company '{company_name}' not found in the company store")
 # ============================================================
     # CLAIM ACCURACY & RISK SCORING
     # ============================================================
@@ -413,17 +433,17 @@ if st.button("Process", type="primary"):
     # -----------------------------------------
     st.markdown("#### 🚨 Greenwashing Risk Index")
     
-    selected_company = company_data.get(company_name, {})
-    carbon_data = selected_company.get("carbon_footprint", {})
+    selected_company = company_store.get(company_name, {})
+    scope_values = selected_company.get("scope_values", {})
     
     # 1. Grab NLP Scores
     v_score = vague.get('vague_words_score', 0)
     r_score = difficulty.get('difficulty_to_read_score', 0)
     
     # 2. Calculate Scope 3 Percentage safely
-    s1 = clean_carbon_value(carbon_data.get("scope1")) or 0
-    s2 = clean_carbon_value(carbon_data.get("scope2")) or 0
-    s3 = clean_carbon_value(carbon_data.get("scope3")) or 0
+    s1 = scope_values.get("scope1") or 0
+    s2 = scope_values.get("scope2") or 0
+    s3 = scope_values.get("scope3") or 0
     
     total_carbon = s1 + s2 + s3
     scope3_pct = (s3 / total_carbon * 100) if total_carbon > 0 else 100 
@@ -461,3 +481,36 @@ if st.button("Process", type="primary"):
 
     st.divider()
 
+    # ============================================================
+    # PERFORMANCE
+    # ============================================================
+    if run_trace:
+        with st.expander("⏱️ Performance"):
+            spans = run_trace["spans"]
+            total = sum(sp["wall_s"] for sp in spans if sp["name"] == "pipeline.run")
+            stage_spans = [sp for sp in spans if sp["name"].startswith("stage.")]
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Pipeline Time", f"{total:.2f}s")
+            if stage_spans:
+                slowest = max(stage_spans, key=lambda sp: sp["wall_s"])
+                col2.metric("Slowest Stage", slowest["name"][len("stage."):], f"{slowest['wall_s']:.2f}s", delta_color="off")
+            col3.metric("Spans Recorded", len(spans))
+
+            st.write("**Stages** (stages read from the cache are not listed)")
+            st.dataframe(pd.DataFrame([
+                {"Stage": sp["name"][len("stage."):], "Wall (s)": sp["wall_s"], "CPU (s)": sp["cpu_s"], "Peak Memory (MB)": sp["peak_mb"]}
+                for sp in sorted(stage_spans, key=lambda sp: sp["start_s"])
+            ]), hide_index=True, use_container_width=True)
+
+            st.write("**Hot Functions**")
+            hot = [r for r in run_trace["summary"] if not r["name"].startswith(("stage.", "pipeline."))]
+            st.dataframe(pd.DataFrame([
+                {"Span": r["name"], "Calls": r["calls"], "Wall (s)": r["wall_s"], "CPU (s)": r["cpu_s"],
+                 "Items": r["items"], "Items/s": r["items_per_s"], "Peak Memory (MB)": r["peak_mb"]}
+                for r in hot
+            ]), hide_index=True, use_container_width=True)
+
+            st.caption(f"Run {run_trace['run_id']}. CPU time is process-wide, so stages that ran at the same time share it. "
+                       f"Peak memory is recorded when the app runs with TRACE_MEMORY=1.")
+
@@ -1,118 +1,349 @@
+"""
+Fine-tunes DistilBERT on claims.csv (sentence,label) and saves it to ./claim_classifier.
+
+Built for CPU training on a growing corpus:
+  - sentences are tokenised without padding; each batch is padded to its own
+    longest sentence (DataCollatorWithPadding)
+  - batches are grouped by length, so sentences of similar length share a batch
+  - --stream reads the CSV lazily (shuffle buffer) instead of loading it
+  - --bf16 runs forward passes under bfloat16 autocast (fast on CPUs with AVX512-BF16/AMX)
+  - --workers loads and collates batches in background processes
+  - a checkpoint is written after every epoch; --resume continues from it
+
+The test split is chosen by a hash of the sentence, so it does not change
+between runs or when rows are added to the CSV.
+
+    python model/model.py --data claims.csv --workers 2 --bf16
+    python model/model.py --stream --resume
+"""
+import argparse
 import csv
+import os
 import random
+import time
+import zlib
+from contextlib import nullcontext
+from pathlib import Path
+
 import torch
-from torch.utils.data import Dataset, DataLoader
-from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+from torch.utils.data import Dataset, IterableDataset, DataLoader, Sampler, get_worker_info
+from transformers import DataCollatorWithPadding, DistilBertTokenizerFast, DistilBertForSequenceClassification
 from torch.optim import AdamW
 
 # ---------------- CONFIG ----------------
 
 MODEL_NAME = "distilbert-base-uncased"
+DATA_PATH = "claims.csv"
+SAVE_PATH = "./claim_classifier"
+CHECKPOINT_DIR = "./checkpoints"
 BATCH_SIZE = 8
 EPOCHS = 3
 LR = 2e-5
 MAX_LEN = 128
+TEST_PERCENT = 20
+SEED = 42
 
-# ---------------- LOAD DATA ----------------
-
-data = []
-with open("claims.csv", newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        data.append((row["sentence"], int(row["label"])))
+MEGABATCH = 50          # batches shuffled together before sorting by length
+SHUFFLE_BUFFER = 4096   # rows held in memory by the streaming dataset
+TOKENIZE_CHUNK = 256    # rows tokenised at once by the streaming dataset
+LOG_EVERY = 50          # steps
 
-random.shuffle(data)
+# ---------------- LOAD DATA ----------------
 
-split = int(0.8 * len(data))
-train_data = data[:split]
-test_data = data[split:]
+def is_test(sentence):
+    return zlib.crc32(sentence.encode("utf-8")) % 100 < TEST_PERCENT
+
+
+def read_rows(path, split):
+    """
+    Yields (sentence, label) for the train or test split, reading the CSV lazily.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            sentence = row["sentence"].strip()
+            if sentence and is_test(sentence) == (split == "test"):
+                yield sentence, int(row["label"])
+
+
+def encode(tokenizer, rows, max_len):
+    encodings = tokenizer([s for s, _ in rows], truncation=True, max_length=max_len)
+    return [
+        {"input_ids": ids, "attention_mask": mask, "labels": label}
+        for ids, mask, (_, label) in zip(encodings["input_ids"], encodings["attention_mask"], rows)
+    ]
+
+
+def length_batches(lengths, batch_size, rng):
+    """
+    Shuffles, sorts MEGABATCH batches' worth of items at a time by length,
+    cuts them into batches and shuffles the batch order. Returns lists of indices.
+    """
+    order = list(range(len(lengths)))
+    rng.shuffle(order)
+
+    batches = []
+    step = batch_size * MEGABATCH
+    for start in range(0, len(order), step):
+        chunk = sorted(order[start:start + step], key=lambda i: lengths[i], reverse=True)
+        batches.extend(chunk[i:i + batch_size] for i in range(0, len(chunk), batch_size))
+    rng.shuffle(batches)
+    return batches
 
 # ---------------- DATASET ----------------
 
-tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_NAME)
-
 class ClaimDataset(Dataset):
-    def __init__(self, data):
-        self.sentences = [d[0] for d in data]
-        self.labels = [d[1] for d in data]
-        self.encodings = tokenizer(
-            self.sentences,
-            truncation=True,
-            padding=True,
-            max_length=MAX_LEN
-        )
+    """
+    The whole split, tokenised once without padding.
+    """
+
+    def __init__(self, path, split, tokenizer, max_len=MAX_LEN):
+        self.features = encode(tokenizer, list(read_rows(path, split)), max_len)
+        self.lengths = [len(f["input_ids"]) for f in self.features]
 
     def __len__(self):
-        return len(self.labels)
+        return len(self.features)
 
     def __getitem__(self, idx):
-        item = {k: torch.tensor(v[idx]) for k, v in self.encodings.items()}
-        item["labels"] = torch.tensor(self.labels[idx])
-        return item
+        return self.features[idx]
 
-train_dataset = ClaimDataset(train_data)
-test_dataset = ClaimDataset(test_data)
 
-train_loader = DataLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True)
-test_loader = DataLoader(test_dataset, batch_size=BATCH_SIZE)
+class LengthGroupedSampler(Sampler):
+    """
+    Batch sampler that puts sentences of similar length together, in a
+    different order every epoch (set_epoch) and the same order on a resumed run.
+    """
 
-# ---------------- MODEL ----------------
+    def __init__(self, lengths, batch_size, seed=SEED, shuffle=True):
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.seed = seed
+        self.shuffle = shuffle
+        self.epoch = 0
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def set_epoch(self, epoch):
+        self.epoch = epoch
 
-model = DistilBertForSequenceClassification.from_pretrained(
-    MODEL_NAME,
-    num_labels=2
-)
-model.to(device)
-
-optimizer = AdamW(model.parameters(), lr=LR)
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        if not self.shuffle:
+            order = sorted(range(len(self.lengths)), key=lambda i: self.lengths[i])
+            return iter([order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)])
+        rng = random.Random(self.seed + self.epoch)
+        return iter(length_batches(self.lengths, self.batch_size, rng))
+
+
+class StreamingClaimDataset(IterableDataset):
+    """
+    Reads the CSV row by row and yields length-grouped batches (lists of
+    features) from a shuffle buffer. With several workers, each one takes
+    every n-th row.
+    """
+
+    def __init__(self, path, split, tokenizer, batch_size, max_len=MAX_LEN, seed=SEED, shuffle=True):
+        self.path = path
+        self.split = split
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.max_len = max_len
+        self.seed = seed
+        self.shuffle = shuffle
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _worker_rows(self):
+        worker = get_worker_info()
+        workers, worker_id = (worker.num_workers, worker.id) if worker else (1, 0)
+        for i, row in enumerate(read_rows(self.path, self.split)):
+            if i % workers == worker_id:
+                yield row
+
+    def _batches(self, buffer, rng):
+        features = []
+        for start in range(0, len(buffer), TOKENIZE_CHUNK):
+            features.extend(encode(self.tokenizer, buffer[start:start + TOKENIZE_CHUNK], self.max_len))
+        if not self.shuffle:
+            return [features[i:i + self.batch_size] for i in range(0, len(features), self.batch_size)]
+        lengths = [len(f["input_ids"]) for f in features]
+        return [[features[i] for i in batch] for batch in length_batches(lengths, self.batch_size, rng)]
+
+    def __iter__(self):
+        worker = get_worker_info()
+        rng = random.Random(self.seed + self.epoch * 1000 + (worker.id if worker else 0))
+
+        buffer = []
+        for row in self._worker_rows():
+            buffer.append(row)
+            if len(buffer) >= SHUFFLE_BUFFER:
+                yield from self._batches(buffer, rng)
+                buffer = []
+        if buffer:
+            yield from self._batches(buffer, rng)
+
+
+def build_loader(args, split, tokenizer, collator):
+    train = split == "train"
+    options = {"num_workers": args.workers, "collate_fn": collator}
+
+    if args.stream:
+        dataset = StreamingClaimDataset(args.data, split, tokenizer, args.batch_size, args.max_len,
+                                        args.seed, shuffle=train)
+        # The dataset yields whole batches
+        return DataLoader(dataset, batch_size=None, **options)
+
+    dataset = ClaimDataset(args.data, split, tokenizer, args.max_len)
+    sampler = LengthGroupedSampler(dataset.lengths, args.batch_size, args.seed, shuffle=train)
+    return DataLoader(dataset, batch_sampler=sampler, **options)
+
+# ---------------- CHECKPOINTS ----------------
+
+def save_checkpoint(path, model, optimizer, epoch, args):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    torch.save({
+        "epoch": epoch,
+        "model": model.state_dict(),
+        "optimizer": optimizer.state_dict(),
+        "rng": torch.get_rng_state(),
+        "config": {"model": args.model, "lr": args.lr, "batch_size": args.batch_size, "max_len": args.max_len}
+    }, tmp)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, model, optimizer):
+    """
+    Restores the model, optimizer and RNG; returns the number of finished epochs.
+    """
+    checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+    model.load_state_dict(checkpoint["model"])
+    optimizer.load_state_dict(checkpoint["optimizer"])
+    torch.set_rng_state(checkpoint["rng"])
+    return checkpoint["epoch"]
 
 # ---------------- TRAIN ----------------
 
-model.train()
-for epoch in range(EPOCHS):
-    total_loss = 0
-    for batch in train_loader:
+def autocast(enabled):
+    return torch.autocast("cpu", dtype=torch.bfloat16) if enabled else nullcontext()
+
+
+def train_epoch(model, loader, optimizer, device, bf16, epoch, epochs):
+    model.train()
+    total_loss, steps, samples, tokens, padded = 0.0, 0, 0, 0, 0
+    start = time.perf_counter()
+
+    for batch in loader:
         optimizer.zero_grad()
 
         batch = {k: v.to(device) for k, v in batch.items()}
-        outputs = model(**batch)
+        with autocast(bf16):
+            outputs = model(**batch)
 
         loss = outputs.loss
         loss.backward()
         optimizer.step()
 
         total_loss += loss.item()
+        steps += 1
+        samples += batch["labels"].size(0)
+        tokens += int(batch["attention_mask"].sum())
+        padded += batch["attention_mask"].numel()
+
+        if steps % LOG_EVERY == 0:
+            print(f"  step {steps} | loss {total_loss / steps:.4f} | "
+                  f"{samples / (time.perf_counter() - start):,.1f} samples/s")
 
-    print(f"Epoch {epoch+1}/{EPOCHS} | Loss: {total_loss:.4f}")
+    seconds = time.perf_counter() - start
+    print(f"Epoch {epoch+1}/{epochs} | Loss: {total_loss:.4f} | {samples} samples in {seconds:.1f}s "
+          f"({samples / seconds if seconds else 0:,.1f} samples/s, "
+          f"{tokens / padded * 100 if padded else 0:.1f}% of tokens are not padding)")
 
 # ---------------- TEST ----------------
 
-model.eval()
-correct = 0
-total = 0
+def evaluate(model, loader, device, bf16):
+    model.eval()
+    correct = 0
+    total = 0
 
-with torch.no_grad():
-    for batch in test_loader:
-        labels = batch["labels"].to(device)
-        inputs = {k: v.to(device) for k, v in batch.items() if k != "labels"}
+    with torch.no_grad():
+        for batch in loader:
+            labels = batch["labels"].to(device)
+            inputs = {k: v.to(device) for k, v in batch.items() if k != "labels"}
 
-        outputs = model(**inputs)
-        predictions = torch.argmax(outputs.logits, dim=1)
+            with autocast(bf16):
+                outputs = model(**inputs)
+            predictions = torch.argmax(outputs.logits, dim=1)
 
-        correct += (predictions == labels).sum().item()
-        total += labels.size(0)
+            correct += (predictions == labels).sum().item()
+            total += labels.size(0)
 
-accuracy = correct / total if total > 0 else 0
-print(f"\n✅ Test Accuracy: {accuracy:.2f}")
+    return correct / total if total > 0 else 0
 
-# ---------------- SAVE MODEL ----------------
 
-SAVE_PATH = "./claim_classifier"
+def main():
+    parser = argparse.ArgumentParser(description="Fine-tune the claim classifier.")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV with sentence,label columns")
+    parser.add_argument("--model", default=MODEL_NAME, help="model name or folder to start from")
+    parser.add_argument("--save-path", default=SAVE_PATH)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--lr", type=float, default=LR)
+    parser.add_argument("--max-len", type=int, default=MAX_LEN)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--stream", action="store_true", help="read the CSV lazily instead of loading it")
+    parser.add_argument("--bf16", action="store_true", help="bfloat16 autocast on CPU")
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    parser.add_argument("--resume", action="store_true", help="continue from the last epoch checkpoint")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    torch.manual_seed(args.seed)
+
+    tokenizer = DistilBertTokenizerFast.from_pretrained(args.model)
+    collator = DataCollatorWithPadding(tokenizer)
+
+    train_loader = build_loader(args, "train", tokenizer, collator)
+    test_loader = build_loader(args, "test", tokenizer, collator)
+
+    # ---------------- MODEL ----------------
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    bf16 = args.bf16 and device.type == "cpu"
+
+    model = DistilBertForSequenceClassification.from_pretrained(
+        args.model,
+        num_labels=2
+    )
+    model.to(device)
+
+    optimizer = AdamW(model.parameters(), lr=args.lr)
+
+    checkpoint_path = Path(args.checkpoint_dir) / "last.pt"
+    start_epoch = 0
+    if args.resume and checkpoint_path.exists():
+        start_epoch = load_checkpoint(checkpoint_path, model, optimizer)
+        print(f"↩️ Resuming after epoch {start_epoch} from {checkpoint_path}")
+
+    for epoch in range(start_epoch, args.epochs):
+        # Sampler or streaming dataset: a new, reproducible order per epoch
+        (train_loader.batch_sampler or train_loader.dataset).set_epoch(epoch)
+        train_epoch(model, train_loader, optimizer, device, bf16, epoch, args.epochs)
+        save_checkpoint(checkpoint_path, model, optimizer, epoch + 1, args)
+
+    accuracy = evaluate(model, test_loader, device, bf16)
+    print(f"\n✅ Test Accuracy: {accuracy:.2f}")
+
+    # ---------------- SAVE MODEL ----------------
+
+    model.save_pretrained(args.save_path)
+    tokenizer.save_pretrained(args.save_path)
 
-model.save_pretrained(SAVE_PATH)
-tokenizer.save_pretrained(SAVE_PATH)
+    print(f"\n✅ Model saved to {args.save_path}")
 
-print(f"\n✅ Model saved to {SAVE_PATH}")
 
+if __name__ == "__main__":
+    main()
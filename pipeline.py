@@ -0,0 +1,367 @@
+import copy
+import json
+import os
+import sys
+from pathlib import Path
+
+# -----------------------------
+# Make the stage folders importable
+# -----------------------------
+ROOT = Path(__file__).resolve().parent
+
+for stage_dir in ("claims_extractor", "claim_scorer", "claimtoclassify"):
+    stage_path = str(ROOT / stage_dir)
+    if stage_path not in sys.path:
+        sys.path.insert(0, stage_path)
+
+from dataclasses import asdict, dataclass
+
+from pdf_reader import iter_pdf_pages
+from run_pdf_claims_extractor import extract_claims_from_pages
+from text_normalizer import TEXT_NORMALIZE, PageNormalizer
+from assertiveness import score_claims_batch
+from sum_class import analyze_theme_sentences
+from summarizer_to_claims import summarize_themes
+from result_cache import ResultCache, file_sha256, dir_fingerprint
+from stage_runner import Codec, Stage, StageRunner
+from tracing import span, trace
+
+# -----------------------------
+# Output files (same paths the standalone scripts write)
+# -----------------------------
+CLAIMS_PATH = "claims_extractor/claims.json"
+SCORES_PATH = "claims_extractor/scores.json"
+SCORED_CLAIMS_PATH = "claim_scorer/claims_with_scores.json"
+THEME_ANALYSIS_PATH = "claimtoclassify/environmental_claim_analysis.json"
+THEME_SUMMARIES_PATH = "claimtoclassify/theme_summaries.json"
+THEME_SCORES_PATH = "analyze/theme_summaries_with_scores.json"
+TRACE_PATH = "analyze/pipeline_trace.json"
+
+# -----------------------------
+# Models
+# -----------------------------
+def load_models():
+    """
+    Loads the DistilBERT claim classifier and the sentence vectors used for theming
+    (the memory-mapped vector table, or the spaCy model with SPACY_VECTOR_BACKEND=spacy).
+    Nothing is loaded at import time; call this to warm a worker before the first upload.
+    The frontends wrap this in st.cache_resource so it runs once per server process.
+    """
+    import sum_class
+    from extract_claims import get_classifier
+
+    tokenizer, model, _ = get_classifier()
+
+    if sum_class.VECTOR_BACKEND == "spacy":
+        vectors = sum_class.get_nlp()
+    else:
+        vectors = sum_class.get_vector_table()
+
+    return {
+        "tokenizer": tokenizer,
+        "claim_classifier": model,
+        "vectors": vectors
+    }
+
+# -----------------------------
+# Result cache
+# -----------------------------
+_cache = None
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+
+# -----------------------------
+# Records passed between stages
+# -----------------------------
+@dataclass(slots=True)
+class Claim:
+    sentence: str
+    confidence: float
+    vague_terms: list
+
+
+@dataclass(slots=True)
+class ScoredClaim:
+    sentence: str
+    confidence: float
+    vague_terms: list
+    assertiveness_score: float
+    claim_type: str
+
+
+def _records(cls):
+    return Codec(
+        encode=lambda records: [asdict(r) for r in records],
+        decode=lambda rows: [cls(**row) for row in rows]
+    )
+
+
+CODECS = {
+    "claims": _records(Claim),
+    "scored_claims": _records(ScoredClaim)
+}
+
+# -----------------------------
+# Stage versions: the code and settings each stage's output depends on
+# -----------------------------
+def _code(*modules):
+    return [Path(m.__file__).read_text(encoding="utf-8") for m in modules]
+
+
+def extract_version():
+    import claim_gate
+    import classifier_backends
+    import extract_claims
+    import pdf_reader
+    import run_pdf_claims_extractor
+    import sentence_splitter
+    import vague_words
+    import readablity
+    import text_metrics
+    import text_normalizer
+
+    return {
+        "code": _code(extract_claims, classifier_backends, claim_gate, pdf_reader,
+                      run_pdf_claims_extractor, sentence_splitter, vague_words, readablity, text_metrics,
+                      text_normalizer),
+        "model": dir_fingerprint(extract_claims.MODEL_PATH),
+        "claim_backend": extract_claims.CLAIM_BACKEND,
+        "claim_gate": claim_gate.CLAIM_GATE,
+        "text_normalize": [text_normalizer.TEXT_NORMALIZE, text_normalizer.EDGE_LINES,
+                           text_normalizer.REPEAT_MIN_PAGES, text_normalizer.LOOKAHEAD_PAGES],
+        "max_len": extract_claims.MAX_LEN,
+        "claim_threshold": run_pdf_claims_extractor.CLAIM_THRESHOLD,
+        "vague_terms": vague_words.VAGUE_TERMS
+    }
+
+
+def score_version():
+    import assertiveness
+
+    return {
+        "code": _code(assertiveness),
+        "absolute_terms": assertiveness.ABSOLUTE_TERMS,
+        "qualifier_terms": assertiveness.QUALIFIER_TERMS,
+        "future_terms": assertiveness.FUTURE_TERMS,
+        "performance_pattern": assertiveness.PERFORMANCE_PATTERN.pattern
+    }
+
+
+def theme_version():
+    import sum_class
+    import vector_table
+
+    return {
+        "code": _code(sum_class, vector_table),
+        "themes": sum_class.ENV_THEMES,
+        "spacy_model": sum_class.SPACY_MODEL,
+        "vector_backend": sum_class.VECTOR_BACKEND
+    }
+
+
+def summary_version():
+    import summarizer_to_claims
+
+    return {
+        "code": _code(summarizer_to_claims),
+        "max_sentence_length": summarizer_to_claims.MAX_SENTENCE_LENGTH,
+        "top_n": summarizer_to_claims.TOP_N
+    }
+
+
+def evaluate_version():
+    from analyze import getting_accuracy
+
+    return {"code": _code(getting_accuracy), "groq_model": getting_accuracy.GROQ_MODEL}
+
+# -----------------------------
+# Stages
+# -----------------------------
+def extract_stage(pdf_path, pdf_hash=None, cache=None):
+    if cache is None or pdf_hash is None:
+        pages = iter_pdf_pages(pdf_path)
+    elif cache.has_pages(pdf_hash):
+        pages = cache.iter_pages(pdf_hash)
+    else:
+        pages = cache.record_pages(pdf_hash, iter_pdf_pages(pdf_path))
+
+    # Language metrics are computed while the classifier runs (reader thread)
+    normalizer = PageNormalizer() if TEXT_NORMALIZE else None
+    claims, vague, difficulty = extract_claims_from_pages(pages, source=str(pdf_path), normalizer=normalizer)
+    text_cleanup = normalizer.report() if normalizer else None
+    return [Claim(**c) for c in claims], vague, difficulty, text_cleanup
+
+
+def score_stage(claims):
+    if not claims:
+        return []
+
+    with span("assertiveness.score", items=len(claims)):
+        scored = score_claims_batch([c.sentence for c in claims], [c.confidence for c in claims])
+    return [
+        ScoredClaim(c.sentence, c.confidence, c.vague_terms, float(score), str(claim_type))
+        for c, score, claim_type in zip(claims, scored["assertiveness_score"], scored["claim_type"])
+    ]
+
+
+def theme_stage(claims):
+    return analyze_theme_sentences([c.sentence for c in claims])
+
+
+def summary_stage(theme_metrics):
+    import summarizer_to_claims
+
+    return summarize_themes(theme_metrics, summarizer_to_claims.MAX_SENTENCE_LENGTH, summarizer_to_claims.TOP_N)
+
+
+def groq_stage(theme_summaries):
+    from analyze.getting_accuracy import score_themes
+
+    return score_themes(copy.deepcopy(theme_summaries))
+
+
+def _all_parsed(scored):
+    # A theme whose response could not be parsed is asked again next time
+    return all(details["theme_summary"] for details in scored.values())
+
+
+def build_runner(cache=None):
+    """
+    The pipeline as a DAG. Scoring and theming both only need the claims,
+    so they run at the same time.
+    """
+    stages = [
+        Stage("extract", lambda pdf_path, pdf_hash: extract_stage(pdf_path, pdf_hash, cache),
+              inputs=("pdf_path", "pdf_hash"),
+              outputs=("claims", "vague_words_score", "difficulty_score", "text_cleanup"),
+              version=extract_version),
+        Stage("score", score_stage, inputs=("claims",), outputs=("scored_claims",),
+              version=score_version),
+        Stage("themes", theme_stage, inputs=("claims",), outputs=("theme_metrics",),
+              version=theme_version),
+        Stage("summaries", summary_stage, inputs=("theme_metrics",), outputs=("theme_summaries",),
+              version=summary_version),
+        Stage("evaluate", groq_stage, inputs=("theme_summaries",), outputs=("scored_theme_summaries",),
+              version=evaluate_version, cacheable=_all_parsed),
+    ]
+    return StageRunner(stages, CODECS, cache)
+
+
+LOCAL_TARGETS = ("claims", "vague_words_score", "difficulty_score", "text_cleanup",
+                 "scored_claims", "theme_metrics", "theme_summaries")
+
+
+def _run_targets(results, targets, use_cache):
+    """
+    Runs the stages needed for targets on top of the values already in results.
+    Unchanged stages are read from the stage cache.
+    The spans of the run are added to results["trace"] and saved in TRACE_DIR.
+    """
+    runner = build_runner(get_cache() if use_cache else None)
+
+    fingerprints = results.setdefault("fingerprints", {})
+    values = {
+        name: runner.decode(name, value)
+        for name, value in results.items() if name in runner.producers or name == "pdf_path"
+    }
+    values["pdf_hash"] = results["pdf_hash"]
+
+    # A dashboard run's trace is saved under the run's ID
+    data = results.get("trace") or {"run_id": results.get("run_id")}
+    with trace(data, pdf_path=results["pdf_path"], pdf_hash=results["pdf_hash"]) as t:
+        with span("pipeline.run", targets=list(targets)):
+            runs = runner.run(targets, values, fingerprints)
+
+    if t.spans:
+        results["trace"] = t.to_dict()
+        t.save()
+
+    for name in targets:
+        results[name] = runner.encode(name, values[name])
+    results.setdefault("stage_runs", []).extend(
+        {"stage": r.name, "status": r.status, "seconds": r.seconds} for r in runs
+    )
+    return results
+
+
+def run_pdf_analysis(pdf_path, use_cache=True, run_id=None):
+    """
+    Runs extraction, assertiveness scoring, theme classification and
+    theme summaries in this process. Returns every artifact in one dict.
+    Each stage's output is cached by the stage's code, settings and inputs,
+    so only the stages affected by a change are rerun.
+    run_id (see runs.py) labels the trace.
+    """
+    pdf_hash = file_sha256(pdf_path)
+    results = {
+        "run_id": run_id,
+        "pdf_path": str(pdf_path),
+        "pdf_hash": pdf_hash,
+        "fingerprints": {"pdf_path": pdf_hash, "pdf_hash": pdf_hash}
+    }
+    return _run_targets(results, LOCAL_TARGETS, use_cache)
+
+
+def evaluate_stage(results, use_cache=True):
+    """
+    Scores the theme summaries with Groq (analyze/getting_accuracy.py).
+    The scores are cached like the other stages, unless a theme response
+    could not be parsed.
+    """
+    if "scored_theme_summaries" not in results:
+        _run_targets(results, ("scored_theme_summaries",), use_cache)
+
+    return results["scored_theme_summaries"]
+
+# -----------------------------
+# Save artifacts (a run directory, see runs.py)
+# -----------------------------
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def save_results(results, output_dir=None):
+    """
+    Writes the artifacts under their file names into output_dir (a run
+    directory), or to the fixed paths the standalone scripts read.
+    """
+    def target(path):
+        return path if output_dir is None else os.path.join(output_dir, os.path.basename(path))
+
+    _write_json(target(CLAIMS_PATH), results["claims"])
+    _write_json(target(SCORES_PATH), {
+        "vague_words_score": results["vague_words_score"],
+        "difficulty_score": results["difficulty_score"],
+        "text_cleanup": results["text_cleanup"]
+    })
+    _write_json(target(SCORED_CLAIMS_PATH), results["scored_claims"])
+    _write_json(target(THEME_ANALYSIS_PATH), {"theme_metrics": results["theme_metrics"]})
+    _write_json(target(THEME_SUMMARIES_PATH), results["theme_summaries"])
+    if "scored_theme_summaries" in results:
+        _write_json(target(THEME_SCORES_PATH), results["scored_theme_summaries"])
+    if "trace" in results:
+        _write_json(target(TRACE_PATH), results["trace"])
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print("Please provide PDF path.")
+        sys.exit(1)
+
+    from runs import create_run
+
+    run = create_run(report=os.path.basename(sys.argv[1]))
+    results = run_pdf_analysis(sys.argv[1], run_id=run.run_id)
+    save_results(results, run.path)
+    run.write_meta(status="done", pdf_hash=results["pdf_hash"], claims=len(results["claims"]))
+
+    print(f"Extracted {len(results['claims'])} claims from {sys.argv[1]}")
+    print(f"Pipeline outputs saved to {run.path} ✅")
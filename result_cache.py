@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from stat import S_ISREG
+
+# -----------------------------
+# Settings
+# -----------------------------
+CACHE_DIR = os.getenv("ESG_CACHE_DIR", ".cache/results")
+CACHE_MAX_BYTES = int(os.getenv("ESG_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# -----------------------------
+# Hash helpers
+# -----------------------------
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dir_fingerprint(path):
+    """
+    Cheap fingerprint of a saved model folder (file names, sizes and mtimes).
+    """
+    digest = hashlib.sha256()
+    root = Path(path)
+    if root.exists():
+        for p in sorted(root.rglob("*")):
+            if p.is_file():
+                stat = p.stat()
+                digest.update(f"{p.relative_to(root)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def data_fingerprint(data):
+    text = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+# -----------------------------
+# Content-addressed result cache
+# -----------------------------
+class ResultCache:
+    """
+    On-disk cache for PDF analyses.
+      pages/<pdf sha256>.jsonl            extracted page text (one JSON string per line)
+      stages/<stage>-<key>.json           outputs of one pipeline stage; the key covers
+                                          the stage's code, settings and inputs
+    Entries are touched on every hit; the least recently used files are
+    removed once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = Path(cache_dir)
+        self.max_bytes = max_bytes
+        (self.root / "pages").mkdir(parents=True, exist_ok=True)
+        (self.root / "stages").mkdir(parents=True, exist_ok=True)
+
+    # ---- paths ----
+    def _pages_path(self, pdf_hash):
+        return self.root / "pages" / f"{pdf_hash}.jsonl"
+
+    def _stage_path(self, stage, key):
+        return self.root / "stages" / f"{stage}-{key}.json"
+
+    @staticmethod
+    def _tmp_path(path):
+        # Unique per writer: sessions in one process may write the same entry at once
+        return path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex[:8]}.tmp")
+
+    @staticmethod
+    def _touch(path):
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:   # evicted by another process meanwhile
+            pass
+
+    # ---- level 1: page text ----
+    def has_pages(self, pdf_hash):
+        return self._pages_path(pdf_hash).exists()
+
+    def iter_pages(self, pdf_hash):
+        path = self._pages_path(pdf_hash)
+        self._touch(path)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def record_pages(self, pdf_hash, pages):
+        """
+        Passes pages through unchanged while writing them to the cache.
+        The entry is only committed once every page has been consumed.
+        """
+        path = self._pages_path(pdf_hash)
+        tmp = self._tmp_path(path)
+
+        # Removes the temp file if the consumer stops early or the write fails
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for page in pages:
+                    f.write(json.dumps(page, ensure_ascii=False) + "\n")
+                    yield page
+            self._commit(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        self.evict()
+
+    # ---- stage outputs ----
+    def get_stage(self, stage, key):
+        path = self._stage_path(stage, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        self._touch(path)
+        return entry
+
+    def put_stage(self, stage, key, entry):
+        path = self._stage_path(stage, key)
+        tmp = self._tmp_path(path)
+
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            self._commit(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        self.evict()
+
+    @staticmethod
+    def _commit(tmp, path):
+        try:
+            os.replace(tmp, path)
+        except FileNotFoundError:
+            # Another writer committed the same entry (same content) first
+            pass
+
+    # ---- eviction ----
+    def _file_stats(self, include_tmp=True):
+        """
+        (path, stat) for every cache file; files deleted meanwhile by
+        another process (batch workers, other sessions) are skipped.
+        """
+        stats = []
+        for p in self.root.rglob("*"):
+            if not include_tmp and p.name.endswith(".tmp"):
+                continue
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            if S_ISREG(stat.st_mode):
+                stats.append((p, stat))
+        return stats
+
+    def size_bytes(self):
+        return sum(stat.st_size for _, stat in self._file_stats())
+
+    def evict(self):
+        files = self._file_stats(include_tmp=False)
+        total = sum(stat.st_size for _, stat in files)
+        if total <= self.max_bytes:
+            return
+
+        for p, stat in sorted(files, key=lambda f: f[1].st_mtime):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            total -= stat.st_size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,110 @@
+"""
+Run workspaces.
+
+Every dashboard analysis writes its artifacts to its own directory,
+<RUNS_DIR>/<run id>/, under the usual file names (claims.json, scores.json,
+theme_summaries_with_scores.json, ...) plus meta.json with the company,
+report name, time and status. Concurrent sessions therefore never share a
+file, and "Use Pre-existing JSON Data" picks from these runs. With several
+dashboard replicas, point ESG_RUNS_DIR at storage they all mount.
+"""
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+RUNS_DIR = os.getenv("ESG_RUNS_DIR", "runs")
+RUNS_KEEP = int(os.getenv("ESG_RUNS_KEEP", "200"))   # newest runs kept on disk (0 keeps all)
+META_FILE = "meta.json"
+
+RUN_ID = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{8}$")
+
+
+def new_run_id() -> str:
+    # Sortable by creation time; the random suffix keeps concurrent runs apart
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+class RunWorkspace:
+    """
+    Directory of one run. artifact(path) maps a pipeline output path
+    (pipeline.SCORES_PATH, ...) to the file of the same name in the run.
+    """
+
+    def __init__(self, run_id, runs_dir=RUNS_DIR):
+        if not RUN_ID.match(run_id):
+            raise ValueError(f"Invalid run id: {run_id!r}")
+        self.run_id = run_id
+        self.path = Path(runs_dir) / run_id
+
+    def artifact(self, path) -> Path:
+        return self.path / os.path.basename(path)
+
+    def read_meta(self) -> dict:
+        try:
+            with open(self.path / META_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def write_meta(self, **fields):
+        """
+        Merges fields into meta.json (written atomically, since the picker of
+        another session may be reading it).
+        """
+        meta = {**self.read_meta(), **fields, "run_id": self.run_id, "updated": time.time()}
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.path / f"{META_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path / META_FILE)
+        return meta
+
+
+def create_run(runs_dir=RUNS_DIR, keep=RUNS_KEEP, **meta) -> RunWorkspace:
+    """
+    New workspace with status "running"; old runs beyond keep are removed.
+    """
+    # Pruned first: IDs made in the same second do not sort by creation time
+    if keep:
+        prune_runs(runs_dir, keep - 1)
+    run = RunWorkspace(new_run_id(), runs_dir)
+    run.path.mkdir(parents=True)
+    run.write_meta(created=time.time(), status="running", **meta)
+    return run
+
+
+def list_runs(runs_dir=RUNS_DIR, status=None):
+    """
+    meta.json of every run, newest first; status keeps only runs in that state.
+    """
+    root = Path(runs_dir)
+    if not root.exists():
+        return []
+
+    runs = []
+    for path in sorted(root.iterdir(), reverse=True):
+        if not (path.is_dir() and RUN_ID.match(path.name)):
+            continue
+        meta = RunWorkspace(path.name, runs_dir).read_meta()
+        if meta and (status is None or meta.get("status") == status):
+            runs.append(meta)
+    return runs
+
+
+def prune_runs(runs_dir=RUNS_DIR, keep=RUNS_KEEP):
+    root = Path(runs_dir)
+    if not root.exists():
+        return 0
+    old = sorted((p for p in root.iterdir() if p.is_dir() and RUN_ID.match(p.name)), reverse=True)[keep:]
+    for path in old:
+        shutil.rmtree(path, ignore_errors=True)
+    return len(old)
+
+
+def describe_run(meta) -> str:
+    created = time.strftime("%Y-%m-%d %H:%M", time.localtime(meta.get("created", 0)))
+    return f"{meta.get('company') or 'Unknown company'} · {meta.get('report') or 'report'} · {created}"
@@ -0,0 +1,160 @@
+"""
+Small dependency-aware stage runner.
+
+Each Stage names the values it reads and the values it writes. For a set of
+target values the runner works out which stages are needed, skips those whose
+code, settings and inputs have not changed (their outputs come from the stage
+cache), and runs stages whose inputs are ready at the same time on a thread pool.
+"""
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from result_cache import data_fingerprint
+from tracing import span
+
+STAGE_WORKERS = int(os.getenv("STAGE_WORKERS", "4"))
+
+
+@dataclass(slots=True, frozen=True)
+class Stage:
+    name: str
+    func: Callable                        # called with the input values, returns the outputs
+    inputs: tuple
+    outputs: tuple
+    version: Callable[[], Any]            # code and settings the outputs depend on
+    cacheable: Optional[Callable] = None  # called with the outputs; False keeps them out of the cache
+
+
+@dataclass(slots=True, frozen=True)
+class Codec:
+    """
+    How a value is written to the stage cache (JSON) and read back.
+    """
+    encode: Callable
+    decode: Callable
+
+
+@dataclass(slots=True)
+class StageRun:
+    name: str
+    key: str
+    status: str      # "ran" or "cached"
+    seconds: float
+
+
+class StageRunner:
+    def __init__(self, stages, codecs=None, cache=None, workers=STAGE_WORKERS):
+        self.stages = list(stages)
+        self.codecs = codecs or {}
+        self.cache = cache
+        self.workers = workers
+
+        self.producers = {}
+        for stage in self.stages:
+            for value in stage.outputs:
+                if value in self.producers:
+                    raise ValueError(f"{value!r} is produced by both {self.producers[value].name} and {stage.name}")
+                self.producers[value] = stage
+
+    # ---- value encoding ----
+    def encode(self, name, value):
+        codec = self.codecs.get(name)
+        return codec.encode(value) if codec else value
+
+    def decode(self, name, value):
+        codec = self.codecs.get(name)
+        return codec.decode(value) if codec else value
+
+    # ---- planning ----
+    def plan(self, targets, available):
+        """
+        Stages needed to produce targets from the available values, in dependency order.
+        """
+        needed, seen = [], set()
+
+        def visit(value):
+            if value in available:
+                return
+            stage = self.producers.get(value)
+            if stage is None:
+                raise KeyError(f"No stage produces {value!r}")
+            if stage.name in seen:
+                return
+            seen.add(stage.name)
+            for name in stage.inputs:
+                visit(name)
+            needed.append(stage)
+
+        for target in targets:
+            visit(target)
+        return needed
+
+    @staticmethod
+    def stage_key(stage, fingerprints):
+        return data_fingerprint({
+            "stage": stage.name,
+            "version": stage.version(),
+            "inputs": [fingerprints[name] for name in stage.inputs]
+        })
+
+    # ---- execution ----
+    def _run_stage(self, stage, inputs, fingerprints):
+        start = time.perf_counter()
+        key = self.stage_key(stage, fingerprints)
+
+        if self.cache is not None:
+            with span("stage_cache.read", stage=stage.name):
+                entry = self.cache.get_stage(stage.name, key)
+            if entry is not None:
+                outputs = [self.decode(name, v) for name, v in zip(stage.outputs, entry["outputs"])]
+                run = StageRun(stage.name, key, "cached", round(time.perf_counter() - start, 4))
+                return outputs, entry["fingerprints"], run
+
+        with span(f"stage.{stage.name}"):
+            result = stage.func(*inputs)
+        outputs = list(result) if len(stage.outputs) > 1 else [result]
+
+        # Output fingerprints hash the content, so a stage that reruns but
+        # produces the same values does not invalidate the stages after it
+        encoded = [self.encode(name, v) for name, v in zip(stage.outputs, outputs)]
+        output_fps = {name: data_fingerprint(e) for name, e in zip(stage.outputs, encoded)}
+
+        if self.cache is not None and (stage.cacheable is None or stage.cacheable(*outputs)):
+            self.cache.put_stage(stage.name, key, {"outputs": encoded, "fingerprints": output_fps})
+
+        run = StageRun(stage.name, key, "ran", round(time.perf_counter() - start, 4))
+        return outputs, output_fps, run
+
+    def run(self, targets, values, fingerprints):
+        """
+        Computes every target. values and fingerprints hold what is already
+        known (e.g. the PDF path and its hash) and are filled in place.
+        Returns the StageRuns in completion order.
+        """
+        pending = self.plan(targets, values)
+        runs = []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while pending or running:
+                for stage in [s for s in pending if all(name in values for name in s.inputs)]:
+                    pending.remove(stage)
+                    inputs = [values[name] for name in stage.inputs]
+                    # Each stage gets a copy of the caller's context (the active trace)
+                    future = pool.submit(contextvars.copy_context().run,
+                                         self._run_stage, stage, inputs, dict(fingerprints))
+                    running[future] = stage
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    outputs, output_fps, run = future.result()
+                    values.update(zip(stage.outputs, outputs))
+                    fingerprints.update(output_fps)
+                    runs.append(run)
+
+        return runs
@@ -0,0 +1,196 @@
+"""
+Lightweight run tracing.
+
+    with trace() as t:
+        with span("classifier.batch", items=32):
+            ...
+
+Every span records wall time, process CPU time, an item count and (with
+TRACE_MEMORY=1) the tracemalloc peak above the memory in use when it opened.
+Spans only record while a trace is active in the current context, so library
+code can be instrumented unconditionally. Threads do not inherit the context
+on their own: start them through contextvars.copy_context().run.
+
+CPU time is for the whole process, so spans that overlap in time (stages on
+the stage runner's threads, concurrent Groq calls) share it. Memory peaks of
+overlapping spans are attributed to all of them.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_ENABLED = os.getenv("ESG_TRACE", "1") != "0"
+TRACE_DIR = os.getenv("TRACE_DIR", ".cache/traces")
+# tracemalloc slows allocation-heavy code down noticeably, so it is opt-in
+TRACE_MEMORY = os.getenv("TRACE_MEMORY", "0") == "1"
+
+_trace = contextvars.ContextVar("trace", default=None)
+_parent = contextvars.ContextVar("parent_span", default=None)
+
+_memory_lock = threading.Lock()
+_open_spans = {}   # span id -> highest traced memory seen while open
+
+
+def _mark_peak():
+    # Credits the peak since the last reset to every open span, then resets it
+    _, peak = tracemalloc.get_traced_memory()
+    for span_id, seen in _open_spans.items():
+        _open_spans[span_id] = max(seen, peak)
+    tracemalloc.reset_peak()
+
+
+class Trace:
+    def __init__(self, data=None, memory=TRACE_MEMORY):
+        data = data or {}
+        self.run_id = data.get("run_id") or uuid.uuid4().hex[:12]
+        self.started = data.get("started") or time.time()
+        self.meta = dict(data.get("meta", {}))
+        self.spans = list(data.get("spans", []))
+        self.memory = memory
+        self._lock = threading.Lock()
+        self._next_id = max((s["id"] for s in self.spans), default=0) + 1
+
+    def _new_id(self):
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+            return span_id
+
+    def _add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def summary(self):
+        """
+        Spans aggregated by name, slowest first.
+        """
+        by_name = {}
+        for s in self.spans:
+            agg = by_name.setdefault(s["name"], {
+                "name": s["name"], "calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                "items": 0, "peak_mb": None
+            })
+            agg["calls"] += 1
+            agg["wall_s"] += s["wall_s"]
+            agg["cpu_s"] += s["cpu_s"]
+            agg["items"] += s["items"] or 0
+            if s["peak_mb"] is not None:
+                agg["peak_mb"] = max(agg["peak_mb"] or 0.0, s["peak_mb"])
+
+        rows = sorted(by_name.values(), key=lambda r: r["wall_s"], reverse=True)
+        for r in rows:
+            r["wall_s"] = round(r["wall_s"], 4)
+            r["cpu_s"] = round(r["cpu_s"], 4)
+            r["items_per_s"] = round(r["items"] / r["wall_s"], 1) if r["items"] and r["wall_s"] > 0 else None
+        return rows
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_s"])
+        return {
+            "run_id": self.run_id,
+            "started": self.started,
+            "meta": self.meta,
+            "memory": self.memory,
+            "summary": self.summary(),
+            "spans": spans
+        }
+
+    def save(self, trace_dir=TRACE_DIR):
+        path = Path(trace_dir) / f"{self.run_id}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+        return path
+
+
+def current_trace():
+    return _trace.get()
+
+
+@contextmanager
+def trace(data=None, memory=TRACE_MEMORY, **meta):
+    """
+    Makes a Trace active for the block. data continues an earlier trace
+    (its to_dict()), so later steps of the same run add to it.
+    """
+    t = Trace(data, memory)
+    t.meta.update(meta)
+    if not TRACE_ENABLED:
+        yield t
+        return
+
+    started_memory = memory and not tracemalloc.is_tracing()
+    if started_memory:
+        tracemalloc.start()
+
+    token = _trace.set(t)
+    try:
+        yield t
+    finally:
+        _trace.reset(token)
+        if started_memory:
+            tracemalloc.stop()
+
+
+@contextmanager
+def span(name, items=None, **attrs):
+    """
+    Records one span in the active trace; does nothing without one.
+    """
+    t = _trace.get()
+    if t is None:
+        yield
+        return
+
+    span_id = t._new_id()
+    parent = _parent.get()
+    token = _parent.set(span_id)
+
+    memory = t.memory and tracemalloc.is_tracing()
+    if memory:
+        with _memory_lock:
+            _mark_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            _open_spans[span_id] = start_memory
+
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall = time.perf_counter() - start_wall
+        cpu = time.process_time() - start_cpu
+        _parent.reset(token)
+
+        peak_mb = None
+        if memory:
+            with _memory_lock:
+                _mark_peak()
+                peak_mb = round((_open_spans.pop(span_id) - start_memory) / 1024 / 1024, 3)
+
+        t._add({
+            "id": span_id,
+            "parent": parent,
+            "name": name,
+            "thread": threading.current_thread().name,
+            "start_s": round(time.time() - t.started - wall, 4),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "items": items,
+            "peak_mb": peak_mb,
+            "error": error,
+            **attrs
+        })